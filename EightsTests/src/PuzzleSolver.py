@@ -1,6 +1,8 @@
 from copy import deepcopy
 import signal
 import random
+from functools import lru_cache
+from state import get_layout
 
 def timeout_handler(signum, frame):
     raise TimeoutError
@@ -13,33 +15,71 @@ def count_inversions(values):
                 inv_count += 1
     return inv_count
 
-def is_solvable(goal, m):
-    # Flatten the 2D goal into a 1D list
-    values = [cell for row in goal for cell in row]
-
-    inv_count = count_inversions(values)
+# Parity of count_inversions(values) in O(k) instead of O(k^2): the tiles (blank skipped) in board order are a
+# permutation of 1..k-1, and a permutation made of c cycles is (k-1) - c swaps away from sorted
+def inversion_parity(values):
+    tiles = [value for value in values if value]
+    seen = [False] * len(tiles)
+    cycles = 0
+    for start in range(len(tiles)):
+        if not seen[start]:
+            cycles += 1
+            position = start
+            while not seen[position]:
+                seen[position] = True
+                position = tiles[position] - 1
+    return (len(tiles) - cycles) % 2
+
+def is_solvable(goal, m, layout=None):
+    # Flatten the 2D goal into a 1D list (a packed board from state.py when layout is given)
+    values = layout.unpack_flat(goal) if layout is not None else [cell for row in goal for cell in row]
+
+    inv_parity = inversion_parity(values)
     zero_pos = values.index(0)
     # Calculate the row index of the 0 value
     zero_row = zero_pos // m
     if m % 2 == 1:  # For odd width, the number of inversions must be even for it to be solvable
-        return inv_count % 2 == 0
+        return inv_parity == 0
     else:
-        if zero_row % 2 == 1 and inv_count % 2 == 0:
-            return True
-        if zero_row % 2 == 0 and inv_count % 2 == 1:
-            return True
-        return False
+        # for even width a move up or down changes both the blank's row and the inversion parity, so the parity of their
+        # sum never changes; it has to match the goal's, where the blank is on the last row and there are no inversions
+        n = len(values) // m
+        return (zero_row + inv_parity) % 2 == (n - 1) % 2
        
-def manhattan_distance(state): # gives the total distance for each tile on the board
+# Goal row/column of every tile for an n x m board, computed once per shape (index 0 is the blank and is never used)
+@lru_cache(maxsize=None)
+def goal_coordinates(n, m):
+    return tuple(divmod(value - 1, m) if value else None for value in range(n * m))
+
+# manhattan_table(n, m)[tile][cell] is the distance of `tile` from its goal when it sits in `cell` (row-major index)
+@lru_cache(maxsize=None)
+def manhattan_table(n, m):
+    coordinates = goal_coordinates(n, m)
+    table = [(0,) * (n * m)]
+    for value in range(1, n * m):
+        goal_i, goal_j = coordinates[value]
+        table.append(tuple(abs(cell // m - goal_i) + abs(cell % m - goal_j) for cell in range(n * m)))
+    return tuple(table)
+
+# A move only changes the position of one tile, so the child's h is the parent's h with that tile's
+# old contribution swapped for its new one. Works for any per-tile table (manhattan_table, price's weighted table).
+def update_heuristic(h, tile, from_cell, to_cell, table):
+    tile_row = table[tile]
+    return h - tile_row[from_cell] + tile_row[to_cell]
+
+def manhattan_distance(state, layout=None): # gives the total distance for each tile on the board
+    if layout is not None:  # packed board from state.py
+        table = manhattan_table(layout.n, layout.m)
+        return sum(table[value][cell] for cell, value in enumerate(layout.unpack_flat(state)))
     distance = 0
     n = len(state)
     m = len(state[0])
+    coordinates = goal_coordinates(n, m)
     for i in range(n):
         for j in range(m):
             value = state[i][j]
             if value != 0:  #0 doesn't really have a manhattan distance so we can ignore
-                goal_i = (value - 1) // m 
-                goal_j = (value - 1) % m   
+                goal_i, goal_j = coordinates[value]
                 distance += abs(i - goal_i) + abs(j - goal_j) # absolute value used in case we have a 3,2,1 situation 
                 #where 1 is 2 away from its correct position, but without abs it would cause the overall distance to shrink by 2
     return distance
@@ -51,7 +91,7 @@ def find_position(value, goal):
                 return i, j
     return None
 
-def is_complete(state, goal):  # Check if the current state matches the goal state
+def is_complete(state, goal):  # Check if the current state matches the goal state (works for nested lists and packed boards)
     return state == goal
 
 def generate_goal_state(n, m):
@@ -60,18 +100,36 @@ def generate_goal_state(n, m):
     return goal_state
 
 
-def extract_moves(solution_path):
+def extract_moves(solution_path, layout=None):
     moves = []
     for i in range(1, len(solution_path)):
         prev_state = solution_path[i-1]
         current_state = solution_path[i]
+        if layout is not None:  # packed boards: the moved tile sits in the previous board where the blank is now
+            moves.append(layout.tile_at(prev_state, layout.find_blank(current_state)))
+            continue
         curr_zero_i, curr_zero_j = find_position(0, current_state)  
         # The tile that moved into the empty space
         moved_tile = prev_state[curr_zero_i][curr_zero_j]
         moves.append(moved_tile)
     return moves
 
-def generate_child_nodes(current_state):
+# Rebuilds the move list by walking a parent table back from the goal. Each entry maps a state to
+# (parent state, tile that moved), so no per-node path lists or board diffing are needed.
+def reconstruct_moves(parents, state):
+    moves = []
+    while parents[state] is not None:
+        state, tile = parents[state]
+        moves.append(tile)
+    moves.reverse()
+    return moves
+
+def generate_child_nodes(current_state, layout=None, blank=None):
+    if layout is not None:  # packed board: only the legal neighbours of the blank are returned
+        if blank is None:
+            blank = layout.find_blank(current_state)
+        empty_i, empty_j = divmod(blank, layout.m)
+        return empty_i, empty_j, [divmod(cell, layout.m) for cell in layout.neighbours[blank]]
     empty_i, empty_j = find_position(0, current_state)
     possible_moves = [(empty_i - 1, empty_j), (empty_i + 1, empty_j),
                               (empty_i, empty_j - 1), (empty_i, empty_j + 1)]
@@ -80,7 +138,11 @@ def generate_child_nodes(current_state):
 
 def extract_initial_state_from_input():
     # Reading n, m, and goal values
-    input_values = list(map(int, input().split()))
+    return parse_puzzle(input())
+
+# Parses one puzzle line in the stacscheck input format: "n m v1 v2 ... v(n*m)"
+def parse_puzzle(line):
+    input_values = list(map(int, line.split()))
 
     n, m = input_values[0], input_values[1]
     values = input_values[2:]
@@ -101,24 +163,42 @@ def apply_moves_to_state(initial_state, moves):
 
 
 # I use this function to generate a solvable state which is compatible with stacscheck verification for ease of use, as well as allowing my results to be reproducible
-def random_solvable_state(n, m):
+# Exactly half of all shuffles are solvable, and swapping the first two tiles flips the inversion parity without moving
+# the blank, which pairs every unsolvable shuffle with a solvable one - so fixing the parity with that swap instead of
+# reshuffling still gives every solvable board the same chance. rng is any random.Random (e.g. random.Random(seed))
+# for a reproducible sequence; the default is the module-level generator.
+def random_solvable_state(n, m, rng=random):
     while True:
         
         # Flatten the grid and shuffle it
         flat_grid = list(range(1, n * m)) + [0]
-        random.shuffle(flat_grid)
+        rng.shuffle(flat_grid)
         
         grid = [flat_grid[i * m : i * m + m] for i in range(n)]
         
         if is_solvable(grid, m):
-            
-           # Prepare a single list starting with n, m and followed by flattened grid elements
-            #result = [n, m] + flat_grid
-            
-            # Print the result in the desired format
-            #print(" ".join(map(str, result)))
-            
             return grid
+        tiles = [cell for cell, value in enumerate(flat_grid) if value][:2]
+        if len(tiles) == 2:  # boards with a single tile have nothing to swap, so those still reshuffle
+            first, second = tiles
+            flat_grid[first], flat_grid[second] = flat_grid[second], flat_grid[first]
+            return [flat_grid[i * m : i * m + m] for i in range(n)]
+
+# A board `depth` random moves away from the goal (never undoing the previous move), for instances of controlled
+# difficulty: the optimal solution is at most depth moves long, and usually close to it while depth is small
+def random_walk_state(n, m, depth, rng=random):
+    layout = get_layout(n, m)
+    board = layout.unpack_flat(layout.goal)
+    blank, previous_blank = layout.goal_blank, None
+    for _ in range(depth):
+        # on a 1 x m board the only way out of an end cell is back
+        options = [cell for cell in layout.neighbours[blank] if cell != previous_blank] or layout.neighbours[blank]
+        if not options:  # 1 x 1
+            break
+        cell = rng.choice(options)
+        board[blank], board[cell] = board[cell], 0
+        blank, previous_blank = cell, blank
+    return [board[i * m : i * m + m] for i in range(n)]
 
 
 """ This section of PuzzleSolver is specifically for input validation purposes. Given more time I would have made a seperate file for this but due to time constraints I have left it here."""
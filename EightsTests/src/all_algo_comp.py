@@ -1,33 +1,24 @@
 import csv
-import time
-import manhattan
-import astar
-import price
 from PuzzleSolver import random_solvable_state
+from solver_pool import SolverPool
 import matplotlib.pyplot as plt
 
 def format_time_to_sci(time_value):
     """Format time to scientific notation with two significant figures."""
     return "{:.2e}".format(time_value)
 
-def gather_data(n, m, num_trials=1000): #change num_trials to whatever you want
-    data = []
-    for _ in range(num_trials):
-        initialState = random_solvable_state(n, m)
-
-        start_time = time.process_time()
-        _, manhattan_moves = manhattan.manhattan_search(initialState, n, m)
-        manhattan_time = format_time_to_sci(time.process_time() - start_time)
-
-        start_time = time.process_time()
-        _, astar_moves = astar.astar(initialState, n, m)
-        astar_time = format_time_to_sci(time.process_time() - start_time)
+def gather_data(n, m, num_trials=1000, workers=None): #change num_trials to whatever you want
+    # the trials are independent, so they run on a process pool (workers=None uses every core); times are per-worker CPU time
+    puzzles = [(n, m, random_solvable_state(n, m)) for _ in range(num_trials)]
+    with SolverPool(workers, shapes=[(n, m)]) as pool:
+        manhattan_results = list(pool.solve("manhattan", puzzles))
+        astar_results = list(pool.solve("astar", puzzles))
+        price_results = list(pool.solve("price", puzzles))
 
-        start_time = time.process_time()
-        _, price_moves,_placeholder = price.price(initialState, n, m)
-        price_time = format_time_to_sci(time.process_time() - start_time)
-
-        data.append((len(manhattan_moves), manhattan_time, len(astar_moves), astar_time, len(price_moves), price_time))
+    data = []
+    for (manhattan_result, manhattan_time), (astar_result, astar_time), (price_result, price_time) in zip(manhattan_results, astar_results, price_results):
+        data.append((len(manhattan_result[1]), format_time_to_sci(manhattan_time), len(astar_result[1]), format_time_to_sci(astar_time),
+                     len(price_result[1]), format_time_to_sci(price_time)))
 
     data.sort(key=lambda x: x[0])  # sort by number of steps from manhattan_search
 
@@ -0,0 +1,189 @@
+import argparse
+import sys
+from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from heuristics import HEURISTICS, get_heuristic
+from open_list import HeapQueue
+from price import PRICE_HEURISTICS, get_price_heuristic
+from search_stats import SearchStats, timed
+
+# Anytime search, for when some answer is needed fast and a better one if time allows. It is anytime repairing A*
+# (ARA*) with reopening: the first phase is greedy like manhattan_search (priority h alone) and finds a solution within
+# milliseconds; each later phase uses the next weight w (priority g + w * h). A phase ends once nothing on the open list
+# has a priority below the best cost found so far; the open list is then re-sorted for the next weight and the search
+# carries on where it was, rather than starting again. Every solution is strictly cheaper than the one before: a state
+# with g + h at or above the best cost can't lead to anything cheaper, since the heuristic never overestimates, so it
+# is dropped. When the phase with weight 1 ends (or nothing is left to search) the last solution is optimal.
+#
+#   for moves, cost in anytime_search(board, 4, 4, timeout=10):
+#       send(moves)  # every one cheaper than the last
+#
+# cost is "moves" (fewest moves, with a heuristic from heuristics.HEURISTICS) or "price" (cheapest total of tile
+# values, as price.py, with a heuristic from price.PRICE_HEURISTICS).
+
+WEIGHTS = (None, 3, 2, 1.5, 1.25, 1)  # None is the greedy phase
+
+
+def _priority(weight, g, h):
+    return h if weight is None else g + weight * h
+
+
+def _reorder(waiting, weight):
+    # a fresh open list holding every state still waiting to be expanded, sorted for the new weight
+    open_list = HeapQueue()
+    for state, (g, blank, h) in waiting.items():
+        open_list.push(_priority(weight, g, h), g, (state, blank, h))
+    return open_list
+
+
+# Generator of (moves, cost) for ever cheaper solutions. It stops once the last one is proven optimal, when the board
+# is unsolvable, or when the budget runs out; stats.stop_reason is the limit that was hit, and None if the search
+# finished. Stopping early (break, or closing the generator) is fine and still fills in stats.
+def anytime_search(initial_state, n, m, cost="moves", heuristic=None, weights=WEIGHTS, stats=None, timeout=60, budget=None):
+    if cost == "moves":
+        estimate = get_heuristic(heuristic or "manhattan", n, m)
+    elif cost == "price":
+        estimate = get_price_heuristic(heuristic or "weighted_manhattan", n, m)
+    else:
+        raise ValueError(f"Unknown cost: {cost}. Choose from moves, price")
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    best_cost = None
+    evaluate, update = timed(estimate.evaluate, stats), timed(estimate.update, stats)
+    peak_open = peak_closed = 1
+    try:
+        # like idastar, unsolvable boards are rejected up front instead of searching forever
+        if not is_solvable(initial_state, m):
+            return
+
+        layout = get_layout(n, m)
+        goal_state = layout.goal
+        start_state, start_blank = layout.pack(initial_state)
+        best_g = {start_state: 0}
+        parents = {start_state: None}
+        # states on the open list at their best g: state -> (g, blank, h), kept for re-sorting it between phases
+        waiting = {start_state: (0, start_blank, evaluate(start_state))}
+        phase = 0
+        weight = weights[phase]
+        open_list = _reorder(waiting, weight)
+
+        while not open_list.empty():
+            f, g, (state, blank, h) = open_list.pop()
+            if g > best_g[state]:  # a cheaper route to this state was pushed after this entry
+                duplicates += 1
+                continue
+
+            if best_cost is not None and weight is not None and f >= best_cost:
+                # nothing left can improve on best_cost at this weight
+                if phase == len(weights) - 1:
+                    return
+                phase += 1
+                weight = weights[phase]
+                open_list = _reorder(waiting, weight)
+                continue
+
+            del waiting[state]
+            if best_cost is not None and g + h >= best_cost:
+                continue
+
+            if is_complete(state, goal_state):
+                # parent links can have been moved to cheaper routes since g was worked out, so cost the path itself
+                moves = reconstruct_moves(parents, state)
+                best_cost = len(moves) if cost == "moves" else sum(moves)
+                yield moves, best_cost
+                if weight is None and phase < len(weights) - 1:  # the greedy phase has done its job
+                    phase += 1
+                    weight = weights[phase]
+                    open_list = _reorder(waiting, weight)
+                continue
+
+            expanded += 1
+            if expanded >= next_check:
+                next_check = budget.check(expanded)
+
+            for next_state, next_blank, tile in layout.children(state, blank):
+                generated += 1
+                g_next = g + (1 if cost == "moves" else tile)
+                # unlike astar, a state can be reached more cheaply after it was expanded (the weighted phases aren't
+                # A*), so it goes back on the open list instead of being skipped
+                if best_g.get(next_state, g_next + 1) <= g_next:
+                    duplicates += 1
+                    continue
+                h_next = update(h, state, next_state, tile, next_blank, blank)
+                if best_cost is not None and g_next + h_next >= best_cost:
+                    continue
+                best_g[next_state] = g_next
+                parents[next_state] = (state, tile)
+                waiting[next_state] = (g_next, next_blank, h_next)
+                open_list.push(_priority(weight, g_next, h_next), g_next, (next_state, next_blank, h_next))
+            # there is no closed set (states can be reopened), so the seen table stands in for it
+            peak_open, peak_closed = max(peak_open, len(open_list)), len(best_g)
+
+    except BudgetExhausted as exhausted:
+        if best_cost is None:
+            print("timeout exception")
+        stop_reason = exhausted.reason
+
+    finally:
+        if stats is not None:
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed)
+
+
+# Runs anytime_search to the end and returns the best solution in the usual format: (status, moves), plus the total
+# cost for cost="price" like price.price. callback(moves, cost) is called with each solution as it arrives. Unlike the
+# other solvers, running out of budget still gives status 1 if any solution was found (check stats.stop_reason to
+# tell a proven optimum from the best one found in time).
+def anytime(initial_state, n, m, callback=None, **options):
+    best = None
+    for moves, total in anytime_search(initial_state, n, m, **options):
+        best = moves, total
+        if callback is not None:
+            callback(moves, total)
+    if best is None:
+        return -1, []
+    if options.get("cost") == "price":
+        return 1, best[0], best[1]
+    return 1, best[0]
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Anytime solver; reads one puzzle from stdin, reports each better solution on stderr")
+  parser.add_argument("--cost", default="moves", choices=["moves", "price"])
+  parser.add_argument("--heuristic", default=None, choices=list(HEURISTICS) + list(PRICE_HEURISTICS),
+                      help="default manhattan for --cost moves, weighted_manhattan for --cost price")
+  parser.add_argument("--timeout", type=float, default=60, help="seconds to keep improving the solution")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
+  try:
+    n, m, initial_state = extract_initial_state_from_input()
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)
+    if(is_complete(initial_state,generate_goal_state(n,m))):
+        status = 1
+        moves = []
+        print (status,len(moves))
+
+    elif not is_solvable(initial_state,m):
+        status = 0
+        print(status)
+
+    else:
+        def report(moves, total):
+            print(f"found {len(moves)} moves, cost {total}", file=sys.stderr, flush=True)
+        status, moves, *total = anytime(initial_state, n, m, callback=report, cost=args.cost,
+                                        heuristic=args.heuristic, timeout=args.timeout, stats=stats)
+        if status == -1:
+            print(status)
+        elif status == 1 and args.cost == "price":
+         print(status, len(moves), *moves, f"£{total[0]}")
+        elif status == 1:
+         print(status, len(moves),*moves)
+        if stats is not None:
+            stats.report()
+
+  except ValueError as e:
+        print(f"Error: {e}")
@@ -1,79 +1,152 @@
-from queue import PriorityQueue
-from copy import deepcopy
-import signal
-from PuzzleSolver import *
-
-def astar(initial_state, n, m):
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(60) 
-    try:  
-        goal_state = generate_goal_state(n, m)
-        priority_queue = PriorityQueue()
-        visited = set()
-
-        # Start with cost of 0 and heuristic value for initial state
-        g_initial = 0
-        h_initial = manhattan_distance(initial_state)
-        priority_queue.put((g_initial + h_initial, g_initial, [initial_state]))
-
-        while not priority_queue.empty():
-            f_current, g_current, current_path = priority_queue.get()
-            current_state = current_path[-1]
-
-            if is_complete(current_state, goal_state):
-                return 1, extract_moves(current_path)
-
-            visited.add(tuple(map(tuple, current_state)))
-
-            empty_i, empty_j, possible_moves = generate_child_nodes(current_state)
-
-            for move_i, move_j in possible_moves:
-                if 0 <= move_i < n and 0 <= move_j < m:
-                    next_state = [list(row) for row in current_state]
-                    next_state[empty_i][empty_j], next_state[move_i][move_j] = next_state[move_i][move_j], next_state[empty_i][empty_j]
-                    
-                    # Calculate the cost to move to the next state
-                    g_next = g_current + 1
-                    h_next = manhattan_distance(next_state)
-
-                    if tuple(map(tuple, next_state)) not in visited:
-                        f_next = g_next + h_next
-                        next_path = current_path + [next_state]
-                        priority_queue.put((f_next, g_next, next_path))
-
-    except TimeoutError:
-        signal.alarm(0) 
-        print("timeout exception")
-        return -1, []
-
-    signal.alarm(0)  
-    return -1, []
-
-
-
-
-if __name__ == "__main__":
-  try:
-    n, m, initial_state = extract_initial_state_from_input()
-    validate_dimensions(n, m)
-    validate_initial_state(initial_state, n, m)  
-    if(is_complete(initial_state,generate_goal_state(n,m))):
-        status = 1
-        moves = []
-        print (status,len(moves))
-    
-    elif not is_solvable(initial_state,m):
-        status = 0
-        print(status)
-        SystemExit
-    
-    else:
-        status, moves = astar(initial_state, n, m)
-        if status == -1:
-            print(status)
-        elif status == 1:
-         print(status, len(moves),*moves)
-
-  except ValueError as e:
-        print(f"Error: {e}")
+from copy import deepcopy
+import argparse
+from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from open_list import BucketQueue
+from heuristics import HEURISTICS, get_heuristic
+from distance_table import MAX_TABLE_CELLS, load_distance_table, table_solve
+from search_stats import SearchStats, timed
+from solution_cache import SolutionCache
+import native_search
+
+# open_list is any class with the open_list.py interface; f values are small ints here so buckets are the default.
+# heuristic is any name registered in heuristics.py ("manhattan", "linear_conflict", "walking_distance", "pdb").
+# If a complete distance table has been built for this shape (see distance_table.py) the answer is read straight off it
+# instead of searching, whatever the heuristic and backend, and stats.stop_reason is "table"; use_table=False forces a
+# real search.
+# backend="auto" runs the compiled search in native_search.py when numba is installed and it can (Manhattan heuristic,
+# the default open list, at most 16 cells); it returns the same moves, and stops on a memory cap derived from the free
+# memory when the budget sets none (see native_search.py). backend="python" always runs the loop below.
+def astar(initial_state, n, m, open_list=BucketQueue, stats=None, heuristic="manhattan", use_table=True, timeout=60, budget=None, backend="auto"):
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic: {heuristic}. Choose from {', '.join(HEURISTICS)}")
+    if use_table and n * m <= MAX_TABLE_CELLS:
+        table = load_distance_table(n, m)
+        if table is not None:
+            if budget is None:
+                budget = Budget(seconds=timeout)
+            budget.start()
+            try:
+                return table_solve(initial_state, n, m, table)
+            finally:
+                if stats is not None:
+                    stats.record(budget, stop_reason="table")  # no search ran, so the counters stay at 0
+    if backend == "native" or (backend == "auto" and heuristic == "manhattan" and open_list is BucketQueue and native_search.supports(n, m)):
+        if not native_search.supports(n, m) or heuristic != "manhattan":
+            raise ValueError("The native backend needs numba, the manhattan heuristic and at most 16 cells")
+        return native_search.native_astar(initial_state, n, m, stats=stats, timeout=timeout, budget=budget)
+    # load the heuristic's tables only once a search is certain to run, and before the clock starts, so only the
+    # search itself is timed
+    estimate = get_heuristic(heuristic, n, m)
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    evaluate, update = timed(estimate.evaluate, stats), timed(estimate.update, stats)
+    peak_open = 1
+    try:  
+        layout = get_layout(n, m)
+        goal_state = layout.goal
+        priority_queue = open_list()
+        closed = set()
+
+        # States are packed ints (see state.py), carried together with the index of the blank
+        start_state, start_blank = layout.pack(initial_state)
+
+        # best_g holds the cheapest known cost to reach each state; parents holds (parent state, tile moved) for that route
+        g_initial = 0
+        best_g = {start_state: g_initial}
+        parents = {start_state: None}
+
+        # Start with cost of 0 and heuristic value for initial state
+        h_initial = evaluate(start_state)
+        priority_queue.push(g_initial + h_initial, g_initial, (start_state, start_blank))
+
+        while not priority_queue.empty():
+            f_current, g_current, (current_state, blank) = priority_queue.pop()
+
+            # skip stale entries: the state was expanded already or a cheaper route was pushed after this one
+            if current_state in closed or g_current > best_g[current_state]:
+                duplicates += 1
+                continue
+
+            if is_complete(current_state, goal_state):
+                return 1, reconstruct_moves(parents, current_state)
+
+            closed.add(current_state)
+            expanded += 1
+            if expanded >= next_check:
+                next_check = budget.check(expanded)
+
+            h_current = f_current - g_current
+            for next_state, next_blank, tile in layout.children(current_state, blank):
+                generated += 1
+                # Calculate the cost to move to the next state; only `tile` moved (from next_blank into blank)
+                g_next = g_current + 1
+
+                # the heuristic is consistent, so closed states never need reopening and an equal or better g makes this push pointless
+                if next_state in closed or best_g.get(next_state, g_next + 1) <= g_next:
+                    duplicates += 1
+                    continue
+
+                best_g[next_state] = g_next
+                parents[next_state] = (current_state, tile)
+                h_next = update(h_current, current_state, next_state, tile, next_blank, blank)
+                priority_queue.push(g_next + h_next, g_next, (next_state, next_blank))
+            if len(priority_queue) > peak_open:
+                peak_open = len(priority_queue)
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            # every expansion closes one state
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed=expanded)
+
+    return -1, []
+
+
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Optimal A* solver; reads one puzzle from stdin")
+  parser.add_argument("--heuristic", default="manhattan", choices=list(HEURISTICS))
+  parser.add_argument("--cache", metavar="PATH", help="sqlite file of solved boards to reuse and add to (see solution_cache.py)")
+  parser.add_argument("--backend", default="auto", choices=["auto", "python", "native"], help="native needs numba (see native_search.py)")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
+  try:
+    n, m, initial_state = extract_initial_state_from_input()
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)  
+    if(is_complete(initial_state,generate_goal_state(n,m))):
+        status = 1
+        moves = []
+        print (status,len(moves))
+    
+    elif not is_solvable(initial_state,m):
+        status = 0
+        print(status)
+        SystemExit
+    
+    else:
+        if args.cache:
+            status, moves = SolutionCache(path=args.cache).solve("astar", astar, initial_state, n, m, heuristic=args.heuristic,
+                                                                     backend=args.backend, stats=stats)
+        else:
+            status, moves = astar(initial_state, n, m, heuristic=args.heuristic, backend=args.backend, stats=stats)
+        if status == -1:
+            print(status)
+        elif status == 1:
+         print(status, len(moves),*moves)
+        if stats is not None:
+            stats.report()
+
+  except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}")
         SystemExit
\ No newline at end of file
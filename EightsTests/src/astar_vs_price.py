@@ -1,25 +1,26 @@
 import csv
-import time
 from PuzzleSolver import random_solvable_state
-import astar
-import price
+from solver_pool import SolverPool
 
-def gather_data(n, m, num_trials=100):
-    data = []
-    for _ in range(num_trials):
-        initialState = random_solvable_state(n, m)
-        
-        _, astar_moves = astar.astar(initialState, n, m)
-        _, price_moves, price_move_sum = price.price(initialState, n, m)
-        
-        astar_path_length = len(astar_moves)
-        price_path_length = len(price_moves)
-        
-        astar_move_sum = sum(astar_moves)
-        
-        difference = astar_path_length - price_path_length
-        
-        data.append((initialState, astar_path_length, astar_move_sum, price_path_length, price_move_sum, difference))
+def gather_data(n, m, num_trials=100, workers=None):
+    puzzles = [(n, m, random_solvable_state(n, m)) for _ in range(num_trials)]
+    with SolverPool(workers, shapes=[(n, m)]) as pool:
+        # read each solve to the end before starting the next, as all_algo_comp.py does
+        astar_results = list(pool.solve("astar", puzzles))
+        price_results = list(pool.solve("price", puzzles))
+        data = []
+        for (_, _, initialState), (astar_result, _), (price_result, _) in zip(puzzles, astar_results, price_results):
+            _, astar_moves = astar_result
+            _, price_moves, price_move_sum = price_result
+
+            astar_path_length = len(astar_moves)
+            price_path_length = len(price_moves)
+
+            astar_move_sum = sum(astar_moves)
+
+            difference = astar_path_length - price_path_length
+
+            data.append((initialState, astar_path_length, astar_move_sum, price_path_length, price_move_sum, difference))
 
     with open('pricecomparison.csv', 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
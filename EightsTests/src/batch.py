@@ -0,0 +1,89 @@
+import argparse
+import contextlib
+import sys
+from PuzzleSolver import *
+from astar import astar
+from bidirectional import bidirectional_astar
+from heuristics import HEURISTICS
+from idastar import idastar
+from manhattan import manhattan_search
+from price import price
+from solution_cache import SolutionCache
+
+# Batch mode: many puzzles per process. Reads one puzzle per line ("n m v1 ... v(n*m)", the same format the single
+# puzzle CLIs read from stdin) from a file or stdin and streams one result line per puzzle, in the same output format
+# as that solver's own CLI. Lines are read and answered one at a time, so the input can be any length, and the
+# layouts, heuristic tables and pattern databases the solvers cache stay warm from one puzzle to the next.
+#   python batch.py --solver astar puzzles.txt > results.txt
+# --workers N spreads the puzzles over N processes (solver_pool.py); results still come out in input order.
+# --cache PATH answers boards solved before from a sqlite solution cache (solution_cache.py) shared by every worker.
+
+SOLVERS = {
+    "astar": astar,
+    "idastar": idastar,
+    "bidirectional": bidirectional_astar,
+    "manhattan": manhattan_search,
+    "price": price,
+}
+
+def format_result(solver_name, status, moves=(), total_cost=None):
+    if status != 1:
+        return str(status)
+    if solver_name == "price" and total_cost is not None:
+        return " ".join(map(str, [status, len(moves), *moves, f"£{total_cost}"]))
+    return " ".join(map(str, [status, len(moves), *moves]))
+
+def solve_puzzle(solver_name, n, m, initial_state, cache=None, **options):
+    # one result line for an already parsed puzzle, following the checks each CLI does before searching
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)
+    if is_complete(initial_state, generate_goal_state(n, m)):
+        return format_result(solver_name, 1)
+    if not is_solvable(initial_state, m):
+        return format_result(solver_name, 0)
+    # the solvers print "timeout exception" on stdout; keep it off the results stream
+    with contextlib.redirect_stdout(sys.stderr):
+        if cache is None:
+            result = SOLVERS[solver_name](initial_state, n, m, **options)
+        else:
+            result = cache.solve(solver_name, SOLVERS[solver_name], initial_state, n, m, **options)
+    return format_result(solver_name, *result)
+
+def solve_line(line, solver_name="astar", cache=None, **options):
+    try:
+        n, m, initial_state = parse_puzzle(line)
+        return solve_puzzle(solver_name, n, m, initial_state, cache, **options)
+    except (ValueError, IndexError, FileNotFoundError) as e:
+        return f"Error: {e}"
+
+def solve_stream(lines, solver_name="astar", cache=None, **options):
+    # generator: one result per non-blank input line, in input order
+    for line in lines:
+        if line.strip():
+            yield solve_line(line, solver_name, cache, **options)
+
+def solver_options(args):
+    # only the unit-cost A* takes a heuristic name
+    return {"heuristic": args.heuristic} if args.solver == "astar" else {}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve one puzzle per input line and print one result per line")
+    parser.add_argument("input", nargs="?", help="file with one puzzle per line (default: stdin)")
+    parser.add_argument("--solver", default="astar", choices=list(SOLVERS))
+    parser.add_argument("--heuristic", default="manhattan", choices=list(HEURISTICS), help="heuristic for --solver astar")
+    parser.add_argument("--workers", type=int, default=1, help="solver processes (0 = one per core)")
+    parser.add_argument("--cache", metavar="PATH", help="sqlite file of solved boards to reuse and add to")
+    args = parser.parse_args()
+    cache = SolutionCache(path=args.cache) if args.cache else None
+
+    source = open(args.input) if args.input else sys.stdin
+    with source:
+        if args.workers == 1:
+            for result in solve_stream(source, args.solver, cache, **solver_options(args)):
+                print(result, flush=True)
+        else:
+            from solver_pool import SolverPool
+            heuristic = args.heuristic if args.solver == "astar" else None
+            with SolverPool(args.workers or None, heuristic=heuristic, cache=cache) as pool:
+                for result in pool.solve_lines(source, args.solver, **solver_options(args)):
+                    print(result, flush=True)
@@ -0,0 +1,170 @@
+import argparse
+import numpy as np
+from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from search_stats import SearchStats
+from vectorized import as_batch, board_keys, expand_frontier, lookup_arrays, manhattan_distances, unseen_children
+
+# Batched greedy best-first search for large boards, where manhattan_search spends most of its time on per-node Python
+# work. Each round takes the `batch_size` open boards with the lowest Manhattan distance, expands all of them at once
+# with vectorized.expand_frontier, drops the children that were generated before (vectorized.unseen_children) and files
+# the rest in the open list as blocks of NumPy rows rather than one Python object per board. width caps the open list at
+# that many of the best boards, turning the search into a beam search whose frontier never outgrows it. Like
+# manhattan_search it looks for a solution quickly, not a short one.
+
+
+class FrontierBuckets:
+    """The open list as buckets indexed by h, like open_list.BucketQueue, except that each bucket holds blocks of rows:
+    tuples of parallel arrays (boards, blanks, keys, ids) that were pushed together. Pops take the newest block of the
+    lowest bucket first, so a round costs time in proportion to the batch, never to the size of the open list."""
+
+    def __init__(self):
+        self._buckets = []
+        self._size = 0
+
+    def push(self, h, columns):
+        order = np.argsort(h, kind="stable")
+        values, starts = np.unique(h[order], return_index=True)
+        ends = list(starts[1:]) + [len(order)]
+        for value, start, end in zip(values.tolist(), starts.tolist(), ends):
+            while len(self._buckets) <= value:
+                self._buckets.append([])
+            rows = order[start:end]
+            self._buckets[value].append(tuple(column[rows] for column in columns))
+        self._size += len(h)
+
+    def pop(self, count):
+        """(h, columns) for up to count rows with the lowest h."""
+        taken_h, taken = [], []
+        for value, blocks in enumerate(self._buckets):
+            while blocks and count:
+                block = blocks.pop()
+                rows = len(block[0])
+                if rows > count:  # split the block and put the rest back
+                    blocks.append(tuple(column[count:] for column in block))
+                    block = tuple(column[:count] for column in block)
+                    rows = count
+                taken.append(block)
+                taken_h.append(np.full(rows, value))
+                count -= rows
+                self._size -= rows
+            if not count:
+                break
+        return np.concatenate(taken_h), tuple(np.concatenate(column) for column in zip(*taken))
+
+    def trim(self, width):
+        # drop the boards with the highest h (the oldest first within a bucket) until at most width are left
+        for blocks in reversed(self._buckets):
+            while blocks and self._size > width:
+                excess = self._size - width
+                rows = len(blocks[0][0])
+                if rows > excess:
+                    blocks[0] = tuple(column[excess:] for column in blocks[0])
+                    self._size -= excess
+                else:
+                    blocks.pop(0)
+                    self._size -= rows
+            if self._size <= width:
+                break
+
+    def __len__(self):
+        return self._size
+
+
+# Same (status, moves) result as manhattan_search; the expansion count only reaches the budget between rounds, so a
+# max_expansions budget can be overshot by up to batch_size.
+def batched_search(initial_state, n, m, batch_size=256, width=None, stats=None, timeout=60, budget=None):
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    peak_open = peak_closed = 1
+    try:
+        table = lookup_arrays(n, m)[0]
+        boards = as_batch([initial_state], n, m).astype(np.int16)
+        keys = board_keys(boards, n, m)
+        seen = set(keys.tolist())
+        open_list = FrontierBuckets()
+        open_list.push(manhattan_distances(boards, n, m), (boards, np.argmax(boards == 0, axis=1), keys, np.zeros(1, dtype=np.int64)))
+        # every node ever generated, by id: its parent's id and the tile that moved to reach it, one array per round
+        parents, moved = [np.array([-1])], [np.array([0])]
+        node_count = 1
+
+        while len(open_list):
+            h, (boards, blanks, keys, ids) = open_list.pop(batch_size)
+
+            # a Manhattan distance of 0 is only possible at the goal
+            goals = np.flatnonzero(h == 0)
+            if len(goals):
+                parent_ids, tiles = np.concatenate(parents).tolist(), np.concatenate(moved).tolist()
+                moves = []
+                node = int(ids[goals[0]])
+                while parent_ids[node] != -1:
+                    moves.append(tiles[node])
+                    node = parent_ids[node]
+                moves.reverse()
+                return 1, moves
+
+            expanded += len(boards)
+            if expanded >= next_check:
+                next_check = budget.check(expanded)
+
+            children, child_blanks, child_h, child_keys, parent_rows, tiles = expand_frontier(boards, blanks, h, keys, n, m, table)
+            generated += len(children)
+            keep = unseen_children(child_keys, seen)
+            duplicates += len(children) - len(keep)
+            if not len(keep):
+                continue
+            child_ids = np.arange(node_count, node_count + len(keep))
+            node_count += len(keep)
+            parents.append(ids[parent_rows[keep]])
+            moved.append(tiles[keep])
+            open_list.push(child_h[keep], (children[keep], child_blanks[keep], child_keys[keep], child_ids))
+            if width is not None:
+                open_list.trim(width)
+            peak_open, peak_closed = max(peak_open, len(open_list)), len(seen)
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed)
+
+    return -1, []
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Batched greedy best-first search; reads one puzzle from stdin")
+  parser.add_argument("--batch-size", type=int, default=256, help="boards expanded per round")
+  parser.add_argument("--width", type=int, default=None, help="keep only this many open boards (beam search)")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
+  try:
+    n, m, initial_state = extract_initial_state_from_input()
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)
+    if(is_complete(initial_state,generate_goal_state(n,m))):
+        status = 1
+        moves = []
+        print (status,len(moves))
+
+    elif not is_solvable(initial_state,m):
+        status = 0
+        print(status)
+
+    else:
+        status, moves = batched_search(initial_state, n, m, batch_size=args.batch_size, width=args.width, stats=stats)
+        if status == -1:
+            print(status)
+        elif status == 1:
+         print(status, len(moves),*moves)
+        if stats is not None:
+            stats.report()
+
+  except ValueError as e:
+        print(f"Error: {e}")
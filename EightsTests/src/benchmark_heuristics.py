@@ -0,0 +1,45 @@
+import argparse
+import random
+import time
+import astar
+from heuristics import HEURISTICS, get_heuristic
+from PuzzleSolver import random_solvable_state, random_walk_state
+from search_stats import SearchStats
+
+# Runs astar with each heuristic on the same random boards and reports nodes expanded and wall time per heuristic.
+# e.g. python benchmark_heuristics.py --size 3 3 --trials 50 --heuristics manhattan linear_conflict walking_distance
+# --depth D benchmarks on boards D random moves from the goal instead of uniformly random ones, for a fixed difficulty.
+# Distance tables are never used here, since reading an answer off one expands nothing whatever the heuristic.
+
+def benchmark(n, m, num_trials, heuristics, seed=0, depth=None):
+    rng = random.Random(seed)
+    if depth is None:
+        boards = [random_solvable_state(n, m, rng) for _ in range(num_trials)]
+    else:
+        boards = [random_walk_state(n, m, depth, rng) for _ in range(num_trials)]
+    results = []
+    for name in heuristics:
+        get_heuristic(name, n, m)  # build tables up front so they are not counted in the timings
+        expanded = solved = 0
+        start_time = time.perf_counter()
+        for board in boards:
+            stats = SearchStats()
+            status, _ = astar.astar(board, n, m, stats=stats, heuristic=name, use_table=False)
+            expanded += stats.expanded
+            solved += status == 1
+        results.append((name, solved, expanded, time.perf_counter() - start_time))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare astar heuristics on a shared set of random boards")
+    parser.add_argument("--size", nargs=2, type=int, default=[3, 3], metavar=("N", "M"))
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=None, help="random-walk length for the boards (default: uniform random)")
+    parser.add_argument("--heuristics", nargs="+", default=list(HEURISTICS), choices=list(HEURISTICS))
+    args = parser.parse_args()
+
+    n, m = args.size
+    print(f"{'heuristic':<18}{'solved':>8}{'expanded':>12}{'wall time (s)':>16}")
+    for name, solved, expanded, wall_time in benchmark(n, m, args.trials, args.heuristics, args.seed, args.depth):
+        print(f"{name:<18}{solved:>8}{expanded:>12}{wall_time:>16.3f}")
@@ -0,0 +1,145 @@
+import argparse
+from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from open_list import BucketQueue
+from search_stats import SearchStats, timed
+
+# Bidirectional front-to-end A* for the unit-cost puzzle, using the MM ("meet in the middle") priority
+# pr(n) = max(g + h, 2g). One search runs forwards from the start towards the fixed goal and one runs backwards from the
+# goal towards the start, each with Manhattan distance to its own target. Whenever a child has already been reached by
+# the other side we have a complete path, and the cheapest one seen is kept in `best`. Capping each side at 2g makes the
+# two frontiers meet in the middle instead of one side running all the way across, and any cheaper path would still
+# have a node on one of the open lists with pr below its cost, so once min(pr) over both sides reaches best it is optimal.
+
+def target_table(target_state, n, m):
+    # like manhattan_table, but measured to the cells the tiles occupy in `target_state` instead of the goal
+    size = n * m
+    target_cells = [0] * size
+    for cell, tile in enumerate(cell for row in target_state for cell in row):
+        target_cells[tile] = cell
+    table = [(0,) * size]
+    for tile in range(1, size):
+        goal_i, goal_j = divmod(target_cells[tile], m)
+        table.append(tuple(abs(cell // m - goal_i) + abs(cell % m - goal_j) for cell in range(size)))
+    return tuple(table)
+
+def bidirectional_astar(initial_state, n, m, stats=None, timeout=60, budget=None):
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    update = timed(update_heuristic, stats)
+    peak_open = 2
+    try:
+        # both searches would just exhaust their half of the state space, so unsolvable boards are rejected up front
+        if not is_solvable(initial_state, m):
+            return -1, []
+
+        layout = get_layout(n, m)
+        start_state, start_blank = layout.pack(initial_state)
+        forward_table = manhattan_table(n, m)
+        backward_table = target_table(initial_state, n, m)
+
+        # per direction: open list, best g, parent table (state -> (neighbour towards that side's root, tile)), closed set
+        sides = []
+        for root, root_blank, table in ((start_state, start_blank, forward_table),
+                                        (layout.goal, layout.goal_blank, backward_table)):
+            h_root = sum(table[tile][cell] for cell, tile in enumerate(layout.unpack_flat(root)))
+            queue = BucketQueue()
+            queue.push(h_root, 0, (root, root_blank, h_root))
+            sides.append((queue, {root: 0}, {root: None}, set(), table))
+
+        best = 0 if start_state == layout.goal else None
+        meeting_state = start_state
+
+        while best != 0:
+            forward_queue, backward_queue = sides[0][0], sides[1][0]
+            if forward_queue.empty() or backward_queue.empty():
+                break
+            forward_priority, backward_priority = forward_queue.peek()[0], backward_queue.peek()[0]
+            if best is not None and best <= min(forward_priority, backward_priority):
+                break
+            # expand the side with the lower priority, or the smaller frontier when they are level
+            side = 0 if (forward_priority, len(forward_queue)) <= (backward_priority, len(backward_queue)) else 1
+            queue, best_g, parents, closed, table = sides[side]
+            other_best_g = sides[1 - side][1]
+
+            _, g_current, (current_state, blank, h_current) = queue.pop()
+            if current_state in closed or g_current > best_g[current_state]:
+                duplicates += 1
+                continue
+            closed.add(current_state)
+            expanded += 1
+            if expanded >= next_check:
+                next_check = budget.check(expanded)
+
+            g_next = g_current + 1
+            for next_state, next_blank, tile in layout.children(current_state, blank):
+                generated += 1
+                if next_state in closed or best_g.get(next_state, g_next + 1) <= g_next:
+                    duplicates += 1
+                    continue
+                best_g[next_state] = g_next
+                parents[next_state] = (current_state, tile)
+                if next_state in other_best_g and (best is None or g_next + other_best_g[next_state] < best):
+                    best = g_next + other_best_g[next_state]
+                    meeting_state = next_state
+                h_next = update(h_current, tile, next_blank, blank, table)
+                queue.push(max(g_next + h_next, 2 * g_next), g_next, (next_state, next_blank, h_next))
+            if len(forward_queue) + len(backward_queue) > peak_open:
+                peak_open = len(forward_queue) + len(backward_queue)
+
+        if best is None:
+            return -1, []
+
+        # start -> meeting state from the forward parents, then meeting state -> goal by replaying the backward
+        # parents: each step there undoes the move that generated it, which slides the same tile back
+        moves = reconstruct_moves(sides[0][2], meeting_state)
+        backward_parents = sides[1][2]
+        state = meeting_state
+        while backward_parents[state] is not None:
+            state, tile = backward_parents[state]
+            moves.append(tile)
+        return 1, moves
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            # both sides' closed sets, one state per expansion
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed=expanded)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Bidirectional A* solver; reads one puzzle from stdin")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
+  try:
+    n, m, initial_state = extract_initial_state_from_input()
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)
+    if(is_complete(initial_state,generate_goal_state(n,m))):
+        status = 1
+        moves = []
+        print (status,len(moves))
+
+    elif not is_solvable(initial_state,m):
+        status = 0
+        print(status)
+
+    else:
+        status, moves = bidirectional_astar(initial_state, n, m, stats=stats)
+        if status == -1:
+            print(status)
+        elif status == 1:
+         print(status, len(moves),*moves)
+        if stats is not None:
+            stats.report()
+
+  except ValueError as e:
+        print(f"Error: {e}")
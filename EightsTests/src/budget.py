@@ -0,0 +1,92 @@
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+# Cooperative search budgets, in place of the old SIGALRM timeouts. signal.alarm only works in the main thread, there
+# is one alarm per process, and a solver arming it clobbers whatever alarm the caller had set. Instead each search
+# loop counts its expansions and hands the count to the budget every `check_every` of them; the budget compares it with
+# the deadline, the expansion cap and the memory cap, and raises BudgetExhausted (a TimeoutError) once one is passed.
+# The solvers catch that, print "timeout exception", return (-1, []) as before, and report the limit that was hit in
+# stats.stop_reason alongside the partial counters.
+#
+# Every solver takes timeout= (the time limit in seconds) or, to cap expansions and memory as well, budget=Budget(...):
+#   stats = SearchStats()
+#   astar(board, 4, 4, stats=stats, budget=Budget(seconds=10, max_expansions=10**6, max_memory=2 * 2**30))
+
+
+class BudgetExhausted(TimeoutError):
+    def __init__(self, reason):
+        super().__init__(f"search budget exhausted: {reason}")
+        self.reason = reason  # "time", "expansions" or "memory"
+
+
+def resident_memory():
+    # bytes of memory the process holds right now (peak so far where /proc is not available)
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def available_memory():
+    # bytes the system could still hand out without swapping (MemAvailable), or None where that is not known
+    try:
+        with open("/proc/meminfo") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class Budget:
+    def __init__(self, seconds=None, max_expansions=None, max_memory=None, check_every=1024):
+        # any limit left as None is not enforced; max_memory is in bytes for the whole process
+        self.seconds = seconds
+        self.max_expansions = max_expansions
+        self.max_memory = max_memory
+        self.check_every = check_every
+        self.deadline = None
+        self.started = None
+        self.peak_memory = 0  # largest resident memory seen by start() and check(), for SearchStats
+
+    def start(self):
+        """Start the clock and return the expansion count at which the search should first call check()."""
+        self.started = time.monotonic()
+        self.deadline = None if self.seconds is None else self.started + self.seconds
+        self.peak_memory = resident_memory()
+        return self._next_check(0)
+
+    def check(self, expanded):
+        """Raise BudgetExhausted if a limit has been passed, otherwise return the expansion count for the next check."""
+        if self.max_expansions is not None and expanded >= self.max_expansions:
+            raise BudgetExhausted("expansions")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise BudgetExhausted("time")
+        memory = resident_memory()
+        self.peak_memory = max(self.peak_memory, memory)
+        if self.max_memory is not None and memory >= self.max_memory:
+            raise BudgetExhausted("memory")
+        return self._next_check(expanded)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def _next_check(self, expanded):
+        next_check = expanded + self.check_every
+        if self.max_expansions is not None:
+            # land exactly on the cap so max_expansions is never overshot
+            next_check = min(next_check, self.max_expansions)
+        return next_check
@@ -0,0 +1,98 @@
+import mmap
+import os
+import sys
+from collections import deque
+from math import factorial
+from pattern_database import TABLE_DIR, UNSEEN
+from state import get_layout
+
+# Complete distance tables for small boards. For shapes with at most MAX_TABLE_CELLS cells (3x3 has 181,440 reachable
+# boards) a BFS from the goal labels every reachable board with its optimal distance. The table is one byte per
+# permutation rank, stored in tables/distance_<n>x<m>.bin and memory-mapped, and an optimal solution is read off it by
+# always stepping to a neighbour one move closer to the goal - no search at all. astar uses a table automatically
+# whenever one has been built for the requested shape: python distance_table.py 3 3
+
+MAX_TABLE_CELLS = 9
+
+_loaded = {}
+
+
+def permutation_rank(values):
+    # Lehmer code: position of this ordering of 0..k-1 in the lexicographic list of all k! orderings
+    rank = 0
+    k = len(values)
+    for i in range(k):
+        smaller = 0
+        for j in range(i + 1, k):
+            if values[j] < values[i]:
+                smaller += 1
+        rank += smaller * factorial(k - 1 - i)
+    return rank
+
+
+def build_distance_table(n, m):
+    if n * m > MAX_TABLE_CELLS:
+        raise ValueError(f"Distance tables are only built for boards of up to {MAX_TABLE_CELLS} cells.")
+    layout = get_layout(n, m)
+    distances = {layout.goal: 0}
+    frontier = deque([(layout.goal, layout.goal_blank)])
+    while frontier:
+        packed, blank = frontier.popleft()
+        distance = distances[packed] + 1
+        for child, child_blank, _tile in layout.children(packed, blank):
+            if child not in distances:
+                distances[child] = distance
+                frontier.append((child, child_blank))
+    table = bytearray([UNSEEN]) * factorial(layout.size)
+    for packed, distance in distances.items():
+        table[permutation_rank(layout.unpack_flat(packed))] = distance
+    return table
+
+
+def table_path(n, m, directory=TABLE_DIR):
+    return os.path.join(directory, f"distance_{n}x{m}.bin")
+
+
+def save_distance_table(n, m, directory=TABLE_DIR):
+    table = build_distance_table(n, m)
+    os.makedirs(directory, exist_ok=True)
+    path = table_path(n, m, directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(table)
+    os.replace(temporary, path)
+    return path
+
+
+def load_distance_table(n, m, directory=TABLE_DIR):
+    # the memory-mapped table for this shape, or None if nobody has built one
+    path = table_path(n, m, directory)
+    if path not in _loaded:
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as handle:
+            _loaded[path] = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return _loaded[path]
+
+
+def table_solve(initial_state, n, m, table):
+    """(status, moves) in the astar format, by greedy descent through the distance table."""
+    layout = get_layout(n, m)
+    packed, blank = layout.pack(initial_state)
+    distance = table[permutation_rank(layout.unpack_flat(packed))]
+    if distance == UNSEEN:
+        return -1, []
+    moves = []
+    while distance:
+        for child, child_blank, tile in layout.children(packed, blank):
+            if table[permutation_rank(layout.unpack_flat(child))] == distance - 1:
+                packed, blank = child, child_blank
+                moves.append(tile)
+                distance -= 1
+                break
+    return 1, moves
+
+
+if __name__ == "__main__":
+    n, m = int(sys.argv[1]), int(sys.argv[2])
+    print(f"ready: {save_distance_table(n, m)}")
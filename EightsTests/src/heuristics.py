@@ -0,0 +1,180 @@
+from collections import deque
+from functools import lru_cache
+from PuzzleSolver import goal_coordinates, manhattan_table, update_heuristic
+from pattern_database import PatternDatabase
+from state import get_layout
+
+# Registry of admissible heuristics for the unit-cost solvers, selectable by name (astar(..., heuristic=name) and
+# astar.py --heuristic name). Every heuristic works on packed boards from state.py and has two methods:
+#   evaluate(packed)                                      full value for a board
+#   update(h, parent, child, tile, from_cell, to_cell)    value for `child`, reached from `parent` by sliding `tile`
+# so the search can use a cheap incremental update wherever the heuristic allows one.
+
+
+class ManhattanHeuristic:
+    def __init__(self, n, m):
+        self.layout = get_layout(n, m)
+        self.table = manhattan_table(n, m)
+
+    def evaluate(self, packed):
+        table = self.table
+        return sum(table[tile][cell] for cell, tile in enumerate(self.layout.unpack_flat(packed)))
+
+    def update(self, h, parent, child, tile, from_cell, to_cell):
+        return update_heuristic(h, tile, from_cell, to_cell, self.table)
+
+
+def line_conflicts(goal_positions):
+    # goal_positions: where each tile that belongs in this line wants to be along it, in the order the tiles sit now.
+    # Tiles outside the longest increasing run must leave the line and come back (2 extra moves each),
+    # which is the fewest tiles that have to move for the rest to slide past each other.
+    longest = []
+    for i, position in enumerate(goal_positions):
+        best = 1
+        for j in range(i):
+            if goal_positions[j] < position and longest[j] + 1 > best:
+                best = longest[j] + 1
+        longest.append(best)
+    return len(goal_positions) - max(longest, default=0)
+
+
+class LinearConflictHeuristic(ManhattanHeuristic):
+    """Manhattan distance plus two moves for every tile that has to leave its goal row or column to let others past."""
+
+    def __init__(self, n, m):
+        super().__init__(n, m)
+        self.coordinates = goal_coordinates(n, m)
+        self.rows = tuple(tuple(i * m + j for j in range(m)) for i in range(n))
+        self.columns = tuple(tuple(i * m + j for i in range(n)) for j in range(m))
+
+    def row_conflicts(self, packed, row):
+        tile_at = self.layout.tile_at
+        coordinates = self.coordinates
+        goal_columns = []
+        for cell in self.rows[row]:
+            tile = tile_at(packed, cell)
+            if tile and coordinates[tile][0] == row:
+                goal_columns.append(coordinates[tile][1])
+        return line_conflicts(goal_columns)
+
+    def column_conflicts(self, packed, column):
+        tile_at = self.layout.tile_at
+        coordinates = self.coordinates
+        goal_rows = []
+        for cell in self.columns[column]:
+            tile = tile_at(packed, cell)
+            if tile and coordinates[tile][1] == column:
+                goal_rows.append(coordinates[tile][0])
+        return line_conflicts(goal_rows)
+
+    def evaluate(self, packed):
+        conflicts = sum(self.row_conflicts(packed, row) for row in range(self.layout.n))
+        conflicts += sum(self.column_conflicts(packed, column) for column in range(self.layout.m))
+        return super().evaluate(packed) + 2 * conflicts
+
+    def update(self, h, parent, child, tile, from_cell, to_cell):
+        # A horizontal move keeps the order of the tiles in its row, so only the two columns it leaves and enters can
+        # change; likewise a vertical move only touches the two rows. Every other line keeps its conflicts.
+        h = update_heuristic(h, tile, from_cell, to_cell, self.table)
+        m = self.layout.m
+        from_row, from_column = divmod(from_cell, m)
+        to_row, to_column = divmod(to_cell, m)
+        if from_row == to_row:
+            conflicts, indices = self.column_conflicts, (from_column, to_column)
+        else:
+            conflicts, indices = self.row_conflicts, (from_row, to_row)
+        for index in indices:
+            h += 2 * (conflicts(child, index) - conflicts(parent, index))
+        return h
+
+
+@lru_cache(maxsize=None)
+def walking_distance_table(lines, line_length):
+    """BFS over walking-distance states for one axis: `lines` lines of `line_length` cells.
+
+    A state is a tuple of per-line tuples counting how many tiles of each goal line sit in that line, plus the line
+    the blank is in. Moving the blank to a neighbouring line swaps it with any one tile there, so the distance from
+    the goal state is a lower bound on the moves needed along this axis. A few thousand states up to 4x4, but the 5x5
+    table runs to millions and takes a long time to build in pure Python."""
+    goal_counts = [[0] * lines for _ in range(lines)]
+    for line in range(lines):
+        goal_counts[line][line] = line_length
+    goal_counts[lines - 1][lines - 1] -= 1  # the blank sits in the last cell
+    goal = (tuple(map(tuple, goal_counts)), lines - 1)
+    distances = {goal: 0}
+    frontier = deque([goal])
+    while frontier:
+        counts, blank_line = frontier.popleft()
+        distance = distances[(counts, blank_line)] + 1
+        for next_line in (blank_line - 1, blank_line + 1):
+            if not 0 <= next_line < lines:
+                continue
+            for goal_line in range(lines):
+                if not counts[next_line][goal_line]:
+                    continue
+                moved = [list(row) for row in counts]
+                moved[next_line][goal_line] -= 1
+                moved[blank_line][goal_line] += 1
+                key = (tuple(map(tuple, moved)), next_line)
+                if key not in distances:
+                    distances[key] = distance
+                    frontier.append(key)
+    return distances
+
+
+class WalkingDistanceHeuristic:
+    """Vertical plus horizontal walking distance, each looked up in a table precomputed once per board shape."""
+
+    def __init__(self, n, m):
+        self.layout = get_layout(n, m)
+        self.coordinates = goal_coordinates(n, m)
+        self.vertical = walking_distance_table(n, m)
+        self.horizontal = walking_distance_table(m, n)
+
+    def evaluate(self, packed):
+        n, m = self.layout.n, self.layout.m
+        coordinates = self.coordinates
+        rows = [[0] * n for _ in range(n)]
+        columns = [[0] * m for _ in range(m)]
+        for cell, tile in enumerate(self.layout.unpack_flat(packed)):
+            i, j = divmod(cell, m)
+            if tile:
+                goal_i, goal_j = coordinates[tile]
+                rows[i][goal_i] += 1
+                columns[j][goal_j] += 1
+            else:
+                blank_i, blank_j = i, j
+        return (self.vertical[(tuple(map(tuple, rows)), blank_i)]
+                + self.horizontal[(tuple(map(tuple, columns)), blank_j)])
+
+    def update(self, h, parent, child, tile, from_cell, to_cell):
+        return self.evaluate(child)
+
+
+class PatternDatabaseHeuristic:
+    """Additive pattern databases from pattern_database.py."""
+
+    def __init__(self, n, m):
+        self.pdb = PatternDatabase(n, m, build=False)  # built offline, see pattern_database.py
+
+    def evaluate(self, packed):
+        return self.pdb.evaluate(packed)
+
+    def update(self, h, parent, child, tile, from_cell, to_cell):
+        return self.pdb.evaluate(child)
+
+
+HEURISTICS = {
+    "manhattan": ManhattanHeuristic,
+    "linear_conflict": LinearConflictHeuristic,
+    "walking_distance": WalkingDistanceHeuristic,
+    "pdb": PatternDatabaseHeuristic,
+}
+
+
+# Heuristics hold precomputed tables, so one instance per (name, shape) is shared by every search in the process
+@lru_cache(maxsize=None)
+def get_heuristic(name, n, m):
+    if name not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic: {name}. Choose from {', '.join(HEURISTICS)}")
+    return HEURISTICS[name](n, m)
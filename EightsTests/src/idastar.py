@@ -0,0 +1,148 @@
+import argparse
+from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from pattern_database import PatternDatabase
+from search_stats import SearchStats
+
+# Iterative-deepening A*: repeated depth-first searches bounded by f = g + h, raising the bound to the smallest f that
+# went over it each round. Memory is O(depth) - one mutable flat board that moves are made and unmade on, plus the
+# list of tiles moved so far - which is what lets 4x4 and 5x5 boards run without the A* frontier filling memory.
+
+FOUND = -1
+
+def load_pattern_database(heuristic, n, m):
+    # the PatternDatabase for "pdb", None for plain Manhattan distance; missing tables are an error, not built here
+    if heuristic == "pdb":
+        return PatternDatabase(n, m, build=False)
+    if heuristic == "manhattan":
+        return None
+    raise ValueError(f"Unknown heuristic: {heuristic}")
+
+def start_position(initial_state, pdb):
+    # (flat board, where, h): where[tile] is the cell the tile sits in, kept in step with the board for the pattern
+    # database lookups
+    board = [cell for row in initial_state for cell in row]
+    where = [0] * len(board)
+    for cell, tile in enumerate(board):
+        where[tile] = cell
+    h = manhattan_distance(initial_state) if pdb is None else pdb.evaluate_positions(where)
+    return board, where, h
+
+def bounded_search(board, where, moves, n, m, pdb, budget, next_check):
+    """The depth-first search of one IDA* round, making and unmaking moves on `board` (and `where`, `moves`) in place.
+    Returns search(g, h, blank, previous_blank, bound) -> FOUND with the path in `moves`, the smallest f that went over
+    the bound, or None if every branch dead-ended; and counts() -> (expanded, generated) over all calls so far."""
+    neighbours = get_layout(n, m).neighbours
+    table = manhattan_table(n, m)
+    goal_board = [cell for row in generate_goal_state(n, m) for cell in row]
+    expanded = generated = 0
+
+    def search(g, h, blank, previous_blank, bound):
+        nonlocal expanded, generated, next_check
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and board == goal_board:  # h can only be 0 at the goal, so the list compare is rare
+            return FOUND
+        expanded += 1
+        if expanded >= next_check:
+            next_check = budget.check(expanded)
+        minimum = None
+        for cell in neighbours[blank]:
+            if cell == previous_blank:  # never undo the move we just made
+                continue
+            generated += 1
+            tile = board[cell]
+            if pdb is None:
+                tile_row = table[tile]
+                h_next = h - tile_row[cell] + tile_row[blank]
+            else:
+                h_next = pdb.update(h, where, tile, blank)
+            # make the move in place: the tile slides from cell into the blank
+            board[blank] = tile
+            board[cell] = 0
+            where[tile] = blank
+            moves.append(tile)
+            result = search(g + 1, h_next, cell, blank, bound)
+            if result == FOUND:
+                return FOUND
+            # unmake it
+            moves.pop()
+            board[cell] = tile
+            board[blank] = 0
+            where[tile] = cell
+            if result is not None and (minimum is None or result < minimum):
+                minimum = result
+        return minimum
+
+    def counts():
+        return expanded, generated
+
+    return search, counts
+
+# heuristic is "manhattan" or "pdb" (additive pattern databases, see pattern_database.py); both are updated per move
+def idastar(initial_state, n, m, stats=None, heuristic="manhattan", timeout=60, budget=None):
+    # load the pattern tables before the clock starts, so only the search itself is timed
+    pdb = load_pattern_database(heuristic, n, m)
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    board, where, h_initial = start_position(initial_state, pdb)
+    moves = []
+    search, counts = bounded_search(board, where, moves, n, m, pdb, budget, budget.start())
+    stop_reason = None
+    try:
+        # IDA* has no open list to run dry, so unsolvable boards are rejected up front instead of searching forever
+        if not is_solvable(initial_state, m):
+            return -1, []
+
+        blank = board.index(0)
+        bound = h_initial
+        while True:
+            result = search(0, h_initial, blank, None, bound)
+            if result == FOUND:
+                return 1, moves
+            if result is None:  # every branch dead-ended (only possible on 1 x m and n x 1 boards)
+                return -1, []
+            bound = result
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            # no open or closed list, and the heuristic updates are inlined in the search
+            expanded, generated = counts()
+            stats.record(budget, expanded, generated, stop_reason=stop_reason)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Iterative-deepening A* solver; reads one puzzle from stdin")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
+  try:
+    n, m, initial_state = extract_initial_state_from_input()
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)
+    if(is_complete(initial_state,generate_goal_state(n,m))):
+        status = 1
+        moves = []
+        print (status,len(moves))
+
+    elif not is_solvable(initial_state,m):
+        status = 0
+        print(status)
+
+    else:
+        status, moves = idastar(initial_state, n, m, stats=stats)
+        if status == -1:
+            print(status)
+        elif status == 1:
+         print(status, len(moves),*moves)
+        if stats is not None:
+            stats.report()
+
+  except ValueError as e:
+        print(f"Error: {e}")
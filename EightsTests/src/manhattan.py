@@ -1,61 +1,154 @@
 
-from queue import PriorityQueue
-import signal
+import argparse
 from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from open_list import BucketQueue
+from search_stats import SearchStats, timed
 
-def timeout_handler(signum, frame):
-    raise TimeoutError
-
-def manhattan_search(initial_state, n, m):
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(5)  # Set a 60 second timer
+# open_list is any class with the open_list.py interface; the priority is the Manhattan distance alone (g is always 0), so ties are LIFO.
+def manhattan_search(initial_state, n, m, open_list=BucketQueue, stats=None, timeout=5, budget=None):
+    if budget is None:
+        budget = Budget(seconds=timeout)  # 5 seconds unless the caller asks for longer
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    update = timed(update_heuristic, stats)
+    peak_open = 1
     try:  
-        # Calculate the goal state based on dimensions
-        solState = generate_goal_state(n, m)
+        # Calculate the goal state based on dimensions; states are packed ints from state.py
+        layout = get_layout(n, m)
+        table = manhattan_table(n, m)
+        solState = layout.goal
         #  allows you tostore states with their Manhattan distances as priorities
-        priority_queue = PriorityQueue()
-        # Create a set to keep track of visited states
+        priority_queue = open_list()
+        # Create a set to keep track of expanded states
         visitedStates = set()
         # Initialize the priority queue with the initial state and its Manhattan distance
-        initial_manhattan = manhattan_distance(initial_state)
-        priority_queue.put((initial_manhattan, [initial_state]))
+        start_state, start_blank = layout.pack(initial_state)
+        # Parent table: state -> (parent state, tile moved). A state is only ever pushed once, because a second push
+        # would have the same Manhattan distance and can never be better, so this doubles as the seen set
+        parents = {start_state: None}
+        initial_manhattan = timed(manhattan_distance, stats)(start_state, layout)
+        priority_queue.push(initial_manhattan, 0, (start_state, start_blank))
 
         while not priority_queue.empty():
             # Get the state with the lowest Manhattan distance
-            _, current_path = priority_queue.get()
-            current_state = current_path[-1]
+            current_manhattan, _, (current_state, blank) = priority_queue.pop()
+            if current_state in visitedStates:
+                duplicates += 1
+                continue
             # Check if the current state is the goal state
             if is_complete(current_state, solState):
-                return 1, extract_moves(current_path)
+                return 1, reconstruct_moves(parents, current_state)
             # Add the current state to the visited set
-            visitedStates.add(tuple(map(tuple, current_state)))
-            # Generate possible next states by moving the empty space
-            empty_i, empty_j, possible_moves = generate_child_nodes(current_state)
-            for move_i, move_j in possible_moves:
-                if 0 <= move_i < len(current_state) and 0 <= move_j < len(current_state[0]):
-                    # Create a deep  copy of the current state
-                    next_state = [list(row) for row in current_state]
-                    # Swap the empty space and the tile to perform the move
-                    next_state[empty_i][empty_j], next_state[move_i][move_j] = next_state[move_i][move_j], next_state[empty_i][empty_j]
-                    # Check if the next state has been visited
-                    if tuple(map(tuple, next_state)) not in visitedStates:
-                        # Calculate the Manhattan distance for the next state
-                        next_manhattan = manhattan_distance(next_state)
-
-                        # Add the next state and its Manhattan distance to the priority queue
-                        next_path = current_path + [next_state]
-                        priority_queue.put((next_manhattan, next_path))
+            visitedStates.add(current_state)
+            expanded += 1
+            if expanded >= next_check:
+                next_check = budget.check(expanded)
+            # Generate possible next states by sliding each neighbour of the empty space into it
+            for next_state, next_blank, tile in layout.children(current_state, blank):
+                generated += 1
+                # Check if the next state has been expanded or is already waiting in the queue
+                if next_state in parents:
+                    duplicates += 1
+                    continue
+                # Calculate the Manhattan distance for the next state from the one tile that moved
+                next_manhattan = update(current_manhattan, tile, next_blank, blank, table)
+
+                # Add the next state and its Manhattan distance to the priority queue, remembering how we got there
+                parents[next_state] = (current_state, tile)
+                priority_queue.push(next_manhattan, 0, (next_state, next_blank))
+            if len(priority_queue) > peak_open:
+                peak_open = len(priority_queue)
 
         # If no solution is found, return None
-    except TimeoutError:
-        signal.alarm(0) # Reset the alarm when catching the timeout exception
+    except BudgetExhausted as exhausted:
         print("timeout exception")  # message for clarity as I've run into an issue discerning between a priority queue that is empty and one that has timed out in testing
+        stop_reason = exhausted.reason
         return -1, []
 
-    signal.alarm(0)  # Reset the alarm at the end of the function
+    finally:
+        if stats is not None:
+            # every expansion closes one state
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed=expanded)
+
+    return -1, []
+
+# Beam search: greedy best-first with bounded memory. manhattan_search keeps every state it generates, which on 5x5 boards
+# runs out of memory before it runs out of time. This goes one layer of moves at a time and keeps only the `width`
+# children with the lowest Manhattan distance (ties go to the earlier child), so a layer never holds more than width
+# states and the parent table grows by at most width entries per move. States kept in earlier layers are never revisited,
+# which stops the beam from walking in circles but means a narrow beam can run dry; a wider beam finds shorter
+# solutions and fails less often. Same (status, moves) result as manhattan_search.
+# To hold peak memory under a limit, pass budget=Budget(max_memory=bytes): the search stops with stop_reason "memory"
+# before the process grows past it (checked every 1024 expansions, so leave a few MB of room).
+def beam_search(initial_state, n, m, width=1000, stats=None, timeout=5, budget=None):
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    update = timed(update_heuristic, stats)
+    peak_open = peak_closed = 1
+    try:
+        layout = get_layout(n, m)
+        table = manhattan_table(n, m)
+        start_state, start_blank = layout.pack(initial_state)
+        if is_complete(start_state, layout.goal):
+            return 1, []
+        parents = {start_state: None}
+        layer = [(timed(manhattan_distance, stats)(start_state, layout), start_state, start_blank)]
+
+        while layer:
+            children = []
+            for h, state, blank in layer:
+                expanded += 1
+                if expanded >= next_check:
+                    next_check = budget.check(expanded)
+                for next_state, next_blank, tile in layout.children(state, blank):
+                    generated += 1
+                    if next_state in parents:
+                        duplicates += 1
+                        continue
+                    next_h = update(h, tile, next_blank, blank, table)
+                    if next_h == 0:  # only the goal has a Manhattan distance of 0
+                        parents[next_state] = (state, tile)
+                        return 1, reconstruct_moves(parents, next_state)
+                    children.append((next_h, next_state, next_blank, state, tile))
+
+            # the best `width` children, skipping a state that two parents in this layer both reached
+            children.sort(key=lambda child: child[0])
+            layer = []
+            for next_h, next_state, next_blank, state, tile in children:
+                if len(layer) == width:
+                    break
+                if next_state in parents:
+                    duplicates += 1
+                    continue
+                parents[next_state] = (state, tile)
+                layer.append((next_h, next_state, next_blank))
+            # the children of a layer are the most boards held at once
+            peak_open, peak_closed = max(peak_open, len(children)), len(parents)
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed)
+
     return -1, []
 
 if __name__ == "__main__": 
+  parser = argparse.ArgumentParser(description="Greedy best-first search; reads one puzzle from stdin")
+  parser.add_argument("--width", type=int, default=None, help="beam search keeping this many states per move (bounded memory)")
+  parser.add_argument("--max-memory", type=float, default=None, metavar="MB", help="give up before the process uses more memory than this")
+  parser.add_argument("--timeout", type=float, default=5, help="seconds before giving up")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
   try:
     n, m, initial_state = extract_initial_state_from_input()
     if(is_complete(initial_state,generate_goal_state(n,m))):
@@ -69,13 +162,19 @@ if __name__ == "__main__":
         SystemExit
     
     else:
-        status, moves = manhattan_search(initial_state, n, m)
+        budget = Budget(seconds=args.timeout, max_memory=args.max_memory and args.max_memory * 2**20)
+        if args.width is not None:
+            status, moves = beam_search(initial_state, n, m, width=args.width, stats=stats, budget=budget)
+        else:
+            status, moves = manhattan_search(initial_state, n, m, stats=stats, budget=budget)
 
         if status == -1:
             print(status)
         elif status == 1:
             
             print(status, len(moves), *moves)
+        if stats is not None:
+            stats.report()
 
   except ValueError as e:
         print(f"Error: {e}")
@@ -0,0 +1,306 @@
+from functools import lru_cache
+from PuzzleSolver import manhattan_distance, manhattan_table
+from budget import Budget, BudgetExhausted, available_memory, resident_memory
+from state import get_layout
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # the pure Python astar is used instead
+    njit = None
+
+# Compiled A* with the Manhattan heuristic, for boards of up to 16 cells (every packed board fits in a uint64). The
+# per-node work in astar's loop (unpacking the tile, sliding it, updating h, hashing the child, pushing it) is Python
+# bytecode; here the whole loop is one Numba-compiled function over flat NumPy arrays:
+#   a node table (packed board, blank, g, h, parent node, tile moved, closed flag) with one row per state seen,
+#   an open-addressing hash table from packed board to node,
+#   and open_list.BucketQueue rebuilt from arrays: a LIFO linked-list stack of entries per (f, g).
+# Children are generated, skipped and pushed in the same order as astar, and the stacks pop in the same order as
+# BucketQueue, so both return identical move lists and counters.
+#
+# astar picks this automatically (backend="auto") when numba is installed and the heuristic is "manhattan" with the
+# default open list; without numba, AVAILABLE is False and astar stays pure Python. The kernel is plain Python
+# underneath, so native_astar(..., compiled=False) runs it uncompiled (slowly) to check it against astar.
+#
+# The kernel expands states fast enough to fill the machine's memory well before a 60 s deadline, so unlike the Python
+# solvers it always runs under a memory cap: the budget's max_memory if it has one, otherwise default_max_memory().
+# Growing the arrays doubles them, so the cap is also checked before each growth, not just at the budget checks.
+
+AVAILABLE = njit is not None and np is not None
+
+
+def _jit(function):
+    return njit(cache=True, nogil=True)(function) if AVAILABLE else function
+
+
+# share of the memory available when a search starts that it may use by default
+DEFAULT_MEMORY_SHARE = 0.75
+# bytes per node row (packed board, blank, g, h, parent node, tile moved, closed flag), and per hash slot and open entry
+NODE_BYTES, SLOT_BYTES, ENTRY_BYTES = 6 * 8 + 1, 8, 2 * 8
+
+# kernel results
+EMPTY, FOUND, PAUSED, GROW = 0, 1, 2, 3
+# slots in the counters array, which carries the search's scalar state from one kernel call to the next
+NODES, ENTRIES, FREE, FREE_COUNT, SIZE, MIN_F, PENDING, GOAL_NODE, EXPANDED, GENERATED, DUPLICATES, PEAK_OPEN = range(12)
+
+if np is not None:
+    # uint64 constants, so Numba never mixes signed and unsigned ints (which it would turn into floats)
+    _ONE, _SHIFT_A, _SHIFT_B = np.uint64(1), np.uint64(17), np.uint64(31)
+
+
+def supports(n, m):
+    return AVAILABLE and n * m <= 16
+
+
+def default_max_memory():
+    """Memory cap in bytes for searches given no max_memory: what the process holds now plus DEFAULT_MEMORY_SHARE of
+    what the system has available, or None if that can't be found out."""
+    available = available_memory()
+    if available is None:
+        return None
+    return resident_memory() + int(available * DEFAULT_MEMORY_SHARE)
+
+
+@_jit
+def _home_slot(state, slot_mask):
+    return (state ^ (state >> _SHIFT_A) ^ (state >> _SHIFT_B)) & slot_mask
+
+
+@_jit
+def _rehash(slots, node_state, nodes):
+    slot_mask = np.uint64(len(slots) - 1)
+    for node in range(nodes):
+        slot = _home_slot(node_state[node], slot_mask)
+        while slots[slot] >= 0:
+            slot = (slot + _ONE) & slot_mask
+        slots[slot] = node
+
+
+@_jit
+def _search(goal, shifts, neighbours, table, mask, slots, node_state, node_blank, node_g, node_h, node_parent, node_tile,
+            node_closed, entry_node, entry_next, head, count, top_g, counters, limit):
+    # Runs until the goal is popped (FOUND), the open list is empty (EMPTY), `limit` expansions have been made (PAUSED,
+    # so the caller can check its budget) or an array is too small for the next expansion (GROW). A node that was popped
+    # but not yet expanded is kept in counters[PENDING] and expanded first on the next call.
+    slot_mask = np.uint64(len(slots) - 1)
+    while True:
+        node = counters[PENDING]
+        if node < 0:
+            if counters[SIZE] == 0:
+                return EMPTY
+            # pop like BucketQueue: the lowest f, then the largest g, then the newest entry
+            f = counters[MIN_F]
+            while count[f] == 0:
+                f += 1
+            counters[MIN_F] = f
+            g = top_g[f]
+            while head[f, g] < 0:
+                g -= 1
+            top_g[f] = g
+            entry = head[f, g]
+            head[f, g] = entry_next[entry]
+            entry_next[entry] = counters[FREE]
+            counters[FREE] = entry
+            counters[FREE_COUNT] += 1
+            count[f] -= 1
+            counters[SIZE] -= 1
+            node = entry_node[entry]
+
+            if node_closed[node] or g > node_g[node]:
+                counters[DUPLICATES] += 1
+                continue
+            if node_state[node] == goal:
+                counters[GOAL_NODE] = node
+                return FOUND
+            node_closed[node] = True
+            counters[EXPANDED] += 1
+            counters[PENDING] = node
+            if counters[EXPANDED] >= limit:
+                return PAUSED
+
+        g = node_g[node]
+        h = node_h[node]
+        # room for four more nodes and entries; a Manhattan step changes f by 0 or 2
+        if (counters[NODES] + 4 > len(node_state) or 2 * (counters[NODES] + 4) > len(slots)
+                or counters[FREE_COUNT] + len(entry_node) - counters[ENTRIES] < 4
+                or g + h + 2 >= head.shape[0] or g + 1 >= head.shape[1]):
+            return GROW
+        counters[PENDING] = -1
+
+        state = node_state[node]
+        blank = node_blank[node]
+        for k in range(4):
+            cell = neighbours[blank, k]
+            if cell < 0:
+                break
+            tile = (state >> shifts[cell]) & mask
+            child = state + (tile << shifts[blank]) - (tile << shifts[cell])
+            counters[GENERATED] += 1
+            g_next = g + 1
+
+            slot = _home_slot(child, slot_mask)
+            existing = slots[slot]
+            while existing >= 0 and node_state[existing] != child:
+                slot = (slot + _ONE) & slot_mask
+                existing = slots[slot]
+            if existing >= 0 and (node_closed[existing] or node_g[existing] <= g_next):
+                counters[DUPLICATES] += 1
+                continue
+
+            h_next = h - table[tile, cell] + table[tile, blank]
+            if existing < 0:
+                existing = counters[NODES]
+                counters[NODES] += 1
+                slots[slot] = existing
+                node_state[existing] = child
+                node_blank[existing] = cell
+                node_closed[existing] = False
+            node_g[existing] = g_next
+            node_h[existing] = h_next
+            node_parent[existing] = node
+            node_tile[existing] = tile
+
+            # push onto the (f, g) stack, reusing a popped entry when there is one
+            f_next = g_next + h_next
+            entry = counters[FREE]
+            if entry >= 0:
+                counters[FREE] = entry_next[entry]
+                counters[FREE_COUNT] -= 1
+            else:
+                entry = counters[ENTRIES]
+                counters[ENTRIES] += 1
+            entry_node[entry] = existing
+            entry_next[entry] = head[f_next, g_next]
+            head[f_next, g_next] = entry
+            count[f_next] += 1
+            counters[SIZE] += 1
+            if g_next > top_g[f_next]:
+                top_g[f_next] = g_next
+            if f_next < counters[MIN_F]:
+                counters[MIN_F] = f_next
+        if counters[SIZE] > counters[PEAK_OPEN]:
+            counters[PEAK_OPEN] = counters[SIZE]
+
+
+@lru_cache(maxsize=None)
+def _tables(n, m):
+    layout = get_layout(n, m)
+    neighbours = np.full((layout.size, 4), -1, dtype=np.int64)
+    for cell, adjacent in enumerate(layout.neighbours):
+        neighbours[cell, :len(adjacent)] = adjacent
+    return (np.uint64(layout.goal), np.array(layout.shifts, dtype=np.uint64), neighbours,
+            np.array(manhattan_table(n, m), dtype=np.int64), np.uint64(layout.mask))
+
+
+def _extend(array, size, fill=0):
+    # a copy of array with its first axis grown to size, the new rows set to fill
+    grown = np.full((size,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+@lru_cache(maxsize=None)
+def _compile():
+    # solve a 2x2 board once, so compiling (or loading the cached machine code) happens before any budget starts
+    native_astar([[1, 2], [0, 3]], 2, 2)
+
+
+# Same (status, moves) result as astar.astar(..., heuristic="manhattan", use_table=False), with the same stats counters
+# and peak sizes.
+# compiled=False runs the kernel as plain Python, for testing.
+def native_astar(initial_state, n, m, stats=None, timeout=60, budget=None, compiled=True):
+    if n * m > 16:
+        raise ValueError("native_astar only handles boards of up to 16 cells")
+    search, rehash = _search, _rehash
+    if not compiled:
+        search, rehash = getattr(_search, "py_func", _search), getattr(_rehash, "py_func", _rehash)
+    elif AVAILABLE and (n, m) != (2, 2):
+        _compile()
+    goal, shifts, neighbours, table, mask = _tables(n, m)
+    if budget is None:
+        budget = Budget(seconds=timeout, max_memory=default_max_memory())
+    memory_limit = budget.max_memory if budget.max_memory is not None else default_max_memory()
+    next_check = budget.start()
+    counters = np.zeros(12, dtype=np.int64)
+    stop_reason = None
+    try:
+        layout = get_layout(n, m)
+        start_state, start_blank = layout.pack(initial_state)
+        h_initial = manhattan_distance(start_state, layout)
+
+        capacity = 1024
+        slots = np.full(2 * capacity, -1, dtype=np.int64)
+        node_state = np.zeros(capacity, dtype=np.uint64)
+        node_blank, node_g, node_h, node_parent, node_tile = (np.zeros(capacity, dtype=np.int64) for _ in range(5))
+        node_closed = np.zeros(capacity, dtype=np.bool_)
+        entry_node, entry_next = np.zeros(capacity, dtype=np.int64), np.zeros(capacity, dtype=np.int64)
+        head = np.full((h_initial + 64, 64), -1, dtype=np.int64)
+        count, top_g = np.zeros(len(head), dtype=np.int64), np.full(len(head), -1, dtype=np.int64)
+
+        # the start node and its open list entry
+        node_state[0], node_blank[0], node_h[0], node_parent[0] = start_state, start_blank, h_initial, -1
+        slots[_home_slot(node_state[0], np.uint64(len(slots) - 1))] = 0
+        entry_node[0], entry_next[0] = 0, -1
+        head[h_initial, 0] = 0
+        count[h_initial], top_g[h_initial] = 1, 0
+        counters[NODES] = counters[ENTRIES] = counters[SIZE] = counters[PEAK_OPEN] = 1
+        counters[FREE] = counters[PENDING] = counters[GOAL_NODE] = -1
+        counters[MIN_F] = h_initial
+
+        while True:
+            result = search(goal, shifts, neighbours, table, mask, slots, node_state, node_blank, node_g, node_h,
+                            node_parent, node_tile, node_closed, entry_node, entry_next, head, count, top_g, counters,
+                            next_check)
+            if result == FOUND:
+                moves = []
+                node = counters[GOAL_NODE]
+                while node_parent[node] >= 0:
+                    moves.append(int(node_tile[node]))
+                    node = node_parent[node]
+                moves.reverse()
+                return 1, moves
+            if result == EMPTY:
+                return -1, []
+            if result == PAUSED:
+                next_check = budget.check(int(counters[EXPANDED]))
+                continue
+
+            # GROW: double whichever arrays are short of room, unless the doubled arrays would pass the memory cap
+            pending = counters[PENDING]
+            grow_nodes = counters[NODES] + 4 > len(node_state)
+            grow_slots = 2 * (counters[NODES] + 4) > len(slots)
+            grow_entries = counters[FREE_COUNT] + len(entry_node) - counters[ENTRIES] < 4
+            grow_head = node_g[pending] + node_h[pending] + 2 >= head.shape[0] or node_g[pending] + 1 >= head.shape[1]
+            if memory_limit is not None:
+                needed = (grow_nodes * 2 * len(node_state) * NODE_BYTES + grow_slots * 2 * len(slots) * SLOT_BYTES
+                          + grow_entries * 2 * len(entry_node) * ENTRY_BYTES + grow_head * 4 * head.nbytes)
+                if resident_memory() + needed >= memory_limit:
+                    raise BudgetExhausted("memory")
+            if grow_nodes:
+                size = 2 * len(node_state)
+                node_state, node_blank, node_g, node_h, node_parent, node_tile, node_closed = (
+                    _extend(array, size) for array in (node_state, node_blank, node_g, node_h, node_parent, node_tile, node_closed))
+            if grow_slots:
+                slots = np.full(2 * len(slots), -1, dtype=np.int64)
+                rehash(slots, node_state, counters[NODES])
+            if grow_entries:
+                entry_node, entry_next = _extend(entry_node, 2 * len(entry_node)), _extend(entry_next, 2 * len(entry_next))
+            if node_g[pending] + node_h[pending] + 2 >= head.shape[0]:
+                head, count, top_g = _extend(head, 2 * len(head), -1), _extend(count, 2 * len(count)), _extend(top_g, 2 * len(top_g), -1)
+            if node_g[pending] + 1 >= head.shape[1]:
+                head = _extend(head.T, 2 * head.shape[1], -1).T.copy()
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            # the heuristic is part of the kernel, so heuristic_seconds stays None
+            expanded, generated, duplicates, peak_open = (int(counters[slot]) for slot in (EXPANDED, GENERATED, DUPLICATES, PEAK_OPEN))
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed=expanded)
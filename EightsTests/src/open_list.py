@@ -0,0 +1,91 @@
+import heapq
+
+# Open lists for the searches. The solvers are single-threaded, so there is no reason to pay for the lock that
+# queue.PriorityQueue takes on every put/get. Both classes share the same small interface:
+#   push(f, g, item), pop() -> (f, g, item), peek() -> (f, g) of the next pop, empty(), len()
+# and pop the lowest f first, breaking ties towards the larger g (the node closest to the goal) and then LIFO.
+
+
+class BucketQueue:
+    """Array of buckets indexed by f, each one an array of LIFO stacks indexed by g. Needs small non-negative int f and g."""
+
+    def __init__(self):
+        self._buckets = []  # _buckets[f][g] is a stack of items
+        self._counts = []  # number of items stored under each f
+        self._size = 0
+        self._min_f = 0
+
+    def push(self, f, g, item):
+        buckets = self._buckets
+        while len(buckets) <= f:
+            buckets.append([])
+            self._counts.append(0)
+        stacks = buckets[f]
+        while len(stacks) <= g:
+            stacks.append([])
+        stacks[g].append(item)
+        self._counts[f] += 1
+        self._size += 1
+        if f < self._min_f:
+            self._min_f = f
+
+    def pop(self):
+        if not self._size:
+            raise IndexError("pop from an empty BucketQueue")
+        counts = self._counts
+        f = self._min_f
+        while not counts[f]:
+            f += 1
+        self._min_f = f
+        stacks = self._buckets[f]
+        # the last stack is never left empty, so it always holds the largest g in this bucket
+        g = len(stacks) - 1
+        item = stacks[g].pop()
+        while stacks and not stacks[-1]:
+            stacks.pop()
+        counts[f] -= 1
+        self._size -= 1
+        return f, g, item
+
+    def peek(self):
+        if not self._size:
+            raise IndexError("peek at an empty BucketQueue")
+        counts = self._counts
+        f = self._min_f
+        while not counts[f]:
+            f += 1
+        self._min_f = f
+        return f, len(self._buckets[f]) - 1
+
+    def empty(self):
+        return not self._size
+
+    def __len__(self):
+        return self._size
+
+
+class HeapQueue:
+    """Binary heap open list for costs that are too spread out for buckets (e.g. price's tile-value costs)."""
+
+    def __init__(self):
+        self._heap = []
+        self._count = 0
+
+    def push(self, f, g, item):
+        # the negated counter keeps equal (f, g) entries LIFO, like the bucket stacks, and stops items being compared
+        self._count += 1
+        heapq.heappush(self._heap, (f, -g, -self._count, item))
+
+    def pop(self):
+        f, neg_g, _, item = heapq.heappop(self._heap)
+        return f, -neg_g, item
+
+    def peek(self):
+        f, neg_g, _, _ = self._heap[0]
+        return f, -neg_g
+
+    def empty(self):
+        return not self._heap
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,150 @@
+import argparse
+import multiprocessing
+from PuzzleSolver import *
+from budget import Budget, BudgetExhausted
+from search_stats import SearchStats
+from idastar import FOUND, bounded_search, load_pattern_database, start_position
+
+# IDA* spread over several processes for single hard 4x4/5x5 boards. The top of the search tree is expanded breadth
+# first until there are at least `frontier_size` positions, and every IDA* round then searches the subtrees under those
+# positions in parallel with the round's bound. Any solution found within a bound is optimal (every cheaper path was
+# ruled out by an earlier round), so the first worker to find one ends the round. Otherwise the next bound is the
+# smallest f that went over the bound in any subtree, exactly as in idastar.py, and each worker keeps its pattern tables
+# loaded from one round to the next.
+
+_pdb = None
+
+
+def _initialise_worker(n, m, heuristic):
+    global _pdb
+    _pdb = load_pattern_database(heuristic, n, m)
+
+
+def _search_subtree(task):
+    # one frontier position, searched to the round's bound in a worker: (result, moves below the position, counts, stop reason)
+    index, n, m, state, g, blank, previous_blank, bound, budget = task
+    board, where, h = start_position(state, _pdb)
+    moves = []
+    search, counts = bounded_search(board, where, moves, n, m, _pdb, budget, budget.check(0))
+    try:
+        result = search(g, h, blank, previous_blank, bound)
+    except BudgetExhausted as exhausted:
+        return index, None, [], counts(), exhausted.reason
+    return index, result, moves, counts(), None
+
+
+def split_frontier(initial_state, n, m, frontier_size):
+    """Expand the top of the tree level by level (never undoing the last move, like the IDA* search itself) until there
+    are at least frontier_size positions. Returns (frontier, moves, expanded): the positions as (moves to reach it, board,
+    blank, previous blank), or moves to the goal if it turned up on the way (the shallowest goal, so an optimal path)."""
+    neighbours = get_layout(n, m).neighbours
+    goal_board = [cell for row in generate_goal_state(n, m) for cell in row]
+    board = [cell for row in initial_state for cell in row]
+    frontier = [([], board, board.index(0), None)]
+    expanded = 0
+    while frontier and len(frontier) < frontier_size:
+        next_frontier = []
+        for path, board, blank, previous_blank in frontier:
+            if board == goal_board:
+                return [], path, expanded
+            expanded += 1
+            for cell in neighbours[blank]:
+                if cell == previous_blank:
+                    continue
+                child = board[:]
+                child[blank], child[cell] = child[cell], 0
+                next_frontier.append((path + [board[cell]], child, cell, blank))
+        frontier = next_frontier
+    for path, board, blank, previous_blank in frontier:
+        if board == goal_board:
+            return [], path, expanded
+    return frontier, None, expanded
+
+
+# Same (status, moves) result as astar.astar. workers defaults to one per core; frontier_size to 16 subtrees per worker,
+# enough to keep every worker busy while the subtree sizes differ. heuristic is "manhattan" or "pdb" as for idastar.
+# A budget's memory cap applies to each process on its own and its expansion cap to each subtree search and to the
+# total between rounds.
+def parallel_idastar(initial_state, n, m, workers=None, stats=None, heuristic="manhattan", timeout=60, budget=None, frontier_size=None):
+    pdb = load_pattern_database(heuristic, n, m)  # fails here on missing tables, before any worker starts
+    workers = workers or multiprocessing.cpu_count()
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    budget.start()
+    expanded = generated = 0
+    stop_reason = None
+    try:
+        # like idastar, unsolvable boards are rejected up front instead of searching forever
+        if not is_solvable(initial_state, m):
+            return -1, []
+
+        frontier, moves, expanded = split_frontier(initial_state, n, m, frontier_size or workers * 16)
+        if moves is not None:
+            return 1, moves
+        if not frontier:  # every branch dead-ended (only possible on 1 x m and n x 1 boards)
+            return -1, []
+
+        positions = [([board[i * m:(i + 1) * m] for i in range(n)], len(path), blank, previous_blank)
+                     for path, board, blank, previous_blank in frontier]
+        bound = start_position(initial_state, pdb)[2]
+        with multiprocessing.Pool(workers, initializer=_initialise_worker, initargs=(n, m, heuristic)) as pool:
+            while True:
+                tasks = [(index, n, m, *position, bound, budget) for index, position in enumerate(positions)]
+                minimum = None
+                for index, result, subtree_moves, counts, reason in pool.imap_unordered(_search_subtree, tasks):
+                    expanded += counts[0]
+                    generated += counts[1]
+                    if reason is not None:
+                        raise BudgetExhausted(reason)
+                    if result == FOUND:
+                        # leaving the with block terminates the workers still searching this round
+                        return 1, frontier[index][0] + subtree_moves
+                    if result is not None and (minimum is None or result < minimum):
+                        minimum = result
+                if minimum is None:
+                    return -1, []
+                bound = minimum
+                budget.check(expanded)
+
+    except BudgetExhausted as exhausted:
+        print("timeout exception")
+        stop_reason = exhausted.reason
+        return -1, []
+
+    finally:
+        if stats is not None:
+            # memory is this process's; each worker holds about the same again
+            stats.record(budget, expanded, generated, stop_reason=stop_reason)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="IDA* over several processes; reads one puzzle from stdin")
+  parser.add_argument("--workers", type=int, default=None, help="solver processes (default: one per core)")
+  parser.add_argument("--heuristic", default="manhattan", choices=["manhattan", "pdb"])
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
+  try:
+    n, m, initial_state = extract_initial_state_from_input()
+    validate_dimensions(n, m)
+    validate_initial_state(initial_state, n, m)
+    if(is_complete(initial_state,generate_goal_state(n,m))):
+        status = 1
+        moves = []
+        print (status,len(moves))
+
+    elif not is_solvable(initial_state,m):
+        status = 0
+        print(status)
+
+    else:
+        status, moves = parallel_idastar(initial_state, n, m, workers=args.workers, heuristic=args.heuristic, stats=stats)
+        if status == -1:
+            print(status)
+        elif status == 1:
+         print(status, len(moves),*moves)
+        if stats is not None:
+            stats.report()
+
+  except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}")
@@ -0,0 +1,205 @@
+import mmap
+import os
+import sys
+from collections import deque
+from state import get_layout
+
+# Additive pattern databases. The tiles are split into disjoint groups (a partition); for each group we store, for every
+# placement of its tiles, how many moves *of those tiles* are needed to bring them home. Moves of other tiles are free,
+# so the values of the groups can be added and the sum is still admissible (and consistent), and much stronger than
+# plain Manhattan distance on 4x4 and 5x5 boards.
+#
+# Tables are built offline by a backward breadth-first search from the goal (python pattern_database.py N M), stored as
+# one byte per placement in tables/pdb_<n>x<m>_<tiles>.bin and memory-mapped when a solver starts, so every process
+# shares the same pages. The solvers never build a missing table themselves: that would eat their time budget.
+
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables")
+UNSEEN = 255
+
+# The usual partitions: 4-4 for 3x3 and Korf and Felner's 6-6-3 for 4x4. 5x5 gets six blocks of four rather than the
+# usual four groups of six, whose 127.5M-entry tables would take days to build in pure Python; the blocks take minutes.
+# Shapes not listed here fall back to row-major groups of DEFAULT_GROUP_SIZE tiles.
+DEFAULT_PARTITIONS = {
+    (3, 3): ((1, 2, 3, 4), (5, 6, 7, 8)),
+    (4, 4): ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)),
+    (5, 5): ((1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20), (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)),
+}
+DEFAULT_GROUP_SIZE = 4
+
+
+def default_partition(n, m):
+    if (n, m) in DEFAULT_PARTITIONS:
+        return DEFAULT_PARTITIONS[(n, m)]
+    tiles = list(range(1, n * m))
+    return tuple(tuple(tiles[i : i + DEFAULT_GROUP_SIZE]) for i in range(0, len(tiles), DEFAULT_GROUP_SIZE))
+
+
+def table_size(size, k):
+    # number of ways to place k distinguishable tiles on `size` cells
+    entries = 1
+    for i in range(k):
+        entries *= size - i
+    return entries
+
+
+def rank_positions(positions, size):
+    # perfect hash of a placement: mixed-radix number whose i-th digit is the rank of positions[i] among unused cells
+    index = 0
+    for i, cell in enumerate(positions):
+        smaller = cell
+        for earlier in positions[:i]:
+            if earlier < cell:
+                smaller -= 1
+        index = index * (size - i) + smaller
+    return index
+
+
+def unrank_positions(index, size, k):
+    digits = []
+    for i in reversed(range(k)):
+        index, digit = divmod(index, size - i)
+        digits.append(digit)
+    digits.reverse()
+    positions = []
+    for digit in digits:
+        cell = digit
+        for earlier in sorted(positions):
+            if earlier <= cell:
+                cell += 1
+        positions.append(cell)
+    return positions
+
+
+def _region(start, occupied, neighbours):
+    # cells the blank can reach from `start` without moving a pattern tile
+    region = {start}
+    stack = [start]
+    while stack:
+        cell = stack.pop()
+        for adjacent in neighbours[cell]:
+            if adjacent not in region and adjacent not in occupied:
+                region.add(adjacent)
+                stack.append(adjacent)
+    return region
+
+
+def build_pattern_table(n, m, pattern):
+    """Backward BFS from the goal over (placement of the pattern tiles, region the blank is in).
+
+    Blank moves inside its region are free, so each BFS level is one move of a pattern tile. The returned bytearray
+    holds, for every placement rank, the fewest pattern-tile moves over all blank regions. Pure Python, so the
+    6-tile 4x4 and 5x5 tables take a long time; they only ever need building once."""
+    layout = get_layout(n, m)
+    size = layout.size
+    neighbours = layout.neighbours
+    k = len(pattern)
+    table = bytearray([UNSEEN]) * table_size(size, k)
+    # one bit per (placement rank, blank region representative) pair: 11.5 MB for a 6-tile 4x4 pattern instead of 92 MB
+    seen = bytearray((len(table) * size + 7) // 8)
+
+    goal_positions = [tile - 1 for tile in pattern]
+    start_region = min(_region(layout.goal_blank, set(goal_positions), neighbours))
+    start_index = rank_positions(goal_positions, size)
+    start_key = start_index * size + start_region
+    seen[start_key >> 3] |= 1 << (start_key & 7)
+    frontier = deque([start_index * size + start_region])
+    depth = 0
+    while frontier:
+        next_frontier = deque()
+        for key in frontier:
+            index, representative = divmod(key, size)
+            if table[index] == UNSEEN:
+                table[index] = depth
+            positions = unrank_positions(index, size, k)
+            occupied = set(positions)
+            region = _region(representative, occupied, neighbours)
+            for i, cell in enumerate(positions):
+                for target in neighbours[cell]:
+                    if target not in region:
+                        continue
+                    # the pattern tile slides into the blank's region, leaving the blank where the tile was
+                    moved = positions[:]
+                    moved[i] = target
+                    moved_occupied = occupied - {cell} | {target}
+                    child_index = rank_positions(moved, size)
+                    child_key = child_index * size + min(_region(cell, moved_occupied, neighbours))
+                    if not seen[child_key >> 3] & 1 << (child_key & 7):
+                        seen[child_key >> 3] |= 1 << (child_key & 7)
+                        next_frontier.append(child_key)
+        frontier = next_frontier
+        depth += 1
+    return table
+
+
+def table_path(n, m, pattern, directory=None):
+    # directory defaults to TABLE_DIR as it is when called, so tests can point every solver somewhere else
+    return os.path.join(directory or TABLE_DIR, f"pdb_{n}x{m}_{'-'.join(map(str, pattern))}.bin")
+
+
+def load_pattern_table(n, m, pattern, directory=None, build=True):
+    # memory-maps the table file, building and saving it first if it is missing (and build is allowed)
+    path = table_path(n, m, pattern, directory)
+    if not os.path.exists(path):
+        if not build:
+            raise FileNotFoundError(f"No pattern database table at {path}; build the tables first with: "
+                                    f"python pattern_database.py {n} {m}")
+        table = build_pattern_table(n, m, pattern)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary name first so another process never maps a half-written table
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(table)
+        os.replace(temporary, path)
+    with open(path, "rb") as handle:
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class PatternDatabase:
+    """Additive PDB heuristic over a disjoint partition of the tiles. With build=False a missing table raises
+    FileNotFoundError instead of being built, which is how the solvers load them."""
+
+    def __init__(self, n, m, partition=None, directory=None, build=True):
+        self.layout = get_layout(n, m)
+        self.size = n * m
+        self.partition = tuple(tuple(pattern) for pattern in (partition or default_partition(n, m)))
+        self.tables = [load_pattern_table(n, m, pattern, directory, build) for pattern in self.partition]
+        # pattern_of[tile] is the number of the group the tile belongs to, or None for tiles left out of the partition
+        self.pattern_of = [None] * self.size
+        for number, pattern in enumerate(self.partition):
+            for tile in pattern:
+                self.pattern_of[tile] = number
+
+    def pattern_value(self, where, number):
+        # where[tile] is the cell the tile currently sits in
+        return self.tables[number][rank_positions([where[tile] for tile in self.partition[number]], self.size)]
+
+    def evaluate_positions(self, where):
+        return sum(self.pattern_value(where, number) for number in range(len(self.partition)))
+
+    def evaluate(self, packed, layout=None):
+        # packed board from state.py
+        where = [0] * self.size
+        for cell, tile in enumerate((layout or self.layout).unpack_flat(packed)):
+            where[tile] = cell
+        return self.evaluate_positions(where)
+
+    def update(self, h, where, tile, to_cell):
+        # h after `tile` moves to `to_cell`; `where` is the position table before the move and is left unchanged.
+        # Only the moved tile's own group can change value, so this is one rank lookup instead of a full evaluation.
+        number = self.pattern_of[tile]
+        if number is None:
+            return h
+        old_value = self.pattern_value(where, number)
+        from_cell = where[tile]
+        where[tile] = to_cell
+        new_value = self.pattern_value(where, number)
+        where[tile] = from_cell
+        return h - old_value + new_value
+
+
+if __name__ == "__main__":
+    # Precompute the default tables for a shape ahead of time: python pattern_database.py 4 4
+    n, m = int(sys.argv[1]), int(sys.argv[2])
+    for pattern in default_partition(n, m):
+        load_pattern_table(n, m, pattern).close()
+        print(f"ready: {table_path(n, m, pattern)}")
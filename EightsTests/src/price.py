@@ -1,78 +1,183 @@
-from queue import PriorityQueue
+import argparse
+from functools import lru_cache
 from PuzzleSolver import *
-import signal
-
-def timeout_handler(signum, frame):
-    raise TimeoutError
+from budget import Budget, BudgetExhausted
+from heuristics import LinearConflictHeuristic, ManhattanHeuristic
+from open_list import HeapQueue
+from search_stats import SearchStats, timed
+from solution_cache import SolutionCache
 
 # in the price version of the Astar, the new heuritic we we use is weighted Manhattan distance ; 
 # we simply multiply the manhattan distance of each move by its own value eg. if 3 is 2 blocks away from its destination,
 #  the weighted manhattan score is 3x2(6)
-def weighted_mdistance(state):
+def weighted_mdistance(state, layout=None):
+    if layout is not None:  # packed board from state.py
+        table = weighted_mdistance_table(layout.n, layout.m)
+        return sum(table[value][cell] for cell, value in enumerate(layout.unpack_flat(state)))
     distance = 0
     n = len(state)
     m = len(state[0])
+    coordinates = goal_coordinates(n, m)
     for i in range(n):
         for j in range(m):
             value = state[i][j]
             if value != 0:  # 0 doesn't have a position goal
-                goal_i = (value - 1) // m
-                goal_j = (value - 1) % m
+                goal_i, goal_j = coordinates[value]
                 tile_distance = abs(i - goal_i) + abs(j - goal_j)
          
                 distance += (tile_distance *value)
     return distance
 
-def price(initial_state, n, m):
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(60) 
+# Per-tile weighted distance for every cell, so price can update h incrementally with update_heuristic
+@lru_cache(maxsize=None)
+def weighted_mdistance_table(n, m):
+    return tuple(tuple(value * distance for distance in row) for value, row in enumerate(manhattan_table(n, m)))
+
+# Both price heuristics are admissible and consistent for the price cost: a move of tile t costs t and changes t's
+# distance by one, so it changes the weighted Manhattan distance by exactly t, never more than it costs.
+class WeightedManhattanHeuristic(ManhattanHeuristic):
+    def __init__(self, n, m):
+        super().__init__(n, m)
+        self.table = weighted_mdistance_table(n, m)
+
+def weighted_line_conflicts(goal_positions, tiles):
+    # like heuristics.line_conflicts, except that a tile which has to step out of its line and back costs its own
+    # value for each of those two moves, so the tiles that stay are the increasing run with the largest total value
+    best = []
+    for i, position in enumerate(goal_positions):
+        value = tiles[i]
+        for j in range(i):
+            if goal_positions[j] < position and best[j] + tiles[i] > value:
+                value = best[j] + tiles[i]
+        best.append(value)
+    return sum(tiles) - max(best, default=0)
+
+class WeightedLinearConflictHeuristic(LinearConflictHeuristic):
+    """Weighted Manhattan distance plus twice the value of every tile that has to leave its goal row or column to let
+    others past. Never below the weighted Manhattan distance, and a great deal tighter on boards with many conflicts."""
+
+    def __init__(self, n, m):
+        super().__init__(n, m)
+        self.table = weighted_mdistance_table(n, m)
+
+    def line_conflicts(self, packed, cells, axis, index):
+        tile_at = self.layout.tile_at
+        coordinates = self.coordinates
+        goal_positions, tiles = [], []
+        for cell in cells:
+            tile = tile_at(packed, cell)
+            if tile and coordinates[tile][axis] == index:
+                goal_positions.append(coordinates[tile][1 - axis])
+                tiles.append(tile)
+        return weighted_line_conflicts(goal_positions, tiles)
+
+    def row_conflicts(self, packed, row):
+        return self.line_conflicts(packed, self.rows[row], 0, row)
+
+    def column_conflicts(self, packed, column):
+        return self.line_conflicts(packed, self.columns[column], 1, column)
+
+PRICE_HEURISTICS = {
+    "weighted_manhattan": WeightedManhattanHeuristic,
+    "weighted_linear_conflict": WeightedLinearConflictHeuristic,
+}
+
+@lru_cache(maxsize=None)
+def get_price_heuristic(name, n, m):
+    if name not in PRICE_HEURISTICS:
+        raise ValueError(f"Unknown heuristic: {name}. Choose from {', '.join(PRICE_HEURISTICS)}")
+    return PRICE_HEURISTICS[name](n, m)
+
+# Returns (status, moves, total cost), with a cost of None when no solution was found (unsolvable or out of budget).
+# costs are sums of tile values, too spread out for buckets, so a plain heap is the default open list.
+# heuristic is a name from PRICE_HEURISTICS; with either one the first solution found is the cheapest. epsilon > 0 runs
+# weighted A* instead (priority g + (1 + epsilon) * h), which expands far fewer states and returns a solution costing at
+# most (1 + epsilon) times the cheapest.
+def price(initial_state, n, m, open_list=HeapQueue, stats=None, timeout=60, budget=None, heuristic="weighted_manhattan", epsilon=0):
+    estimate = get_price_heuristic(heuristic, n, m)
+    weight = 1 + epsilon
+    if budget is None:
+        budget = Budget(seconds=timeout)
+    next_check = budget.start()
+    expanded = generated = duplicates = 0
+    stop_reason = None
+    evaluate, update = timed(estimate.evaluate, stats), timed(estimate.update, stats)
+    peak_open = 1
     try:  
-        goal_state = generate_goal_state(n, m)
-        priority_queue = PriorityQueue()
-        visited = set()
-
-        # Start with cost of 0 and heuristic value for initial state
-        g_initial = 0
-        h_initial = weighted_mdistance(initial_state)
-        priority_queue.put((g_initial + h_initial, g_initial, [initial_state]))
-
-        while not priority_queue.empty():
-            f_current, g_current, current_path = priority_queue.get()
-            current_state = current_path[-1]
+        layout = get_layout(n, m)
+        goal_state = layout.goal
+        priority_queue = open_list()
+        closed = set()
 
-            if is_complete(current_state, goal_state):
-                return 1, extract_moves(current_path), g_current
+        # States are packed ints (see state.py), carried together with the index of the blank
+        start_state, start_blank = layout.pack(initial_state)
 
-            visited.add(tuple(map(tuple, current_state)))
+        # best_g holds the cheapest known cost to reach each state; parents holds (parent state, tile moved) for that route
+        g_initial = 0
+        best_g = {start_state: g_initial}
+        parents = {start_state: None}
 
-            empty_i, empty_j, possible_moves = generate_child_nodes(current_state)
+        # Start with cost of 0 and heuristic value for initial state; h travels with each entry because f may be weighted
+        h_initial = evaluate(start_state)
+        priority_queue.push(g_initial + weight * h_initial, g_initial, (start_state, start_blank, h_initial))
 
-            for move_i, move_j in possible_moves:
-                if 0 <= move_i < n and 0 <= move_j < m:
-                    next_state = [list(row) for row in current_state]
-                    next_state[empty_i][empty_j], next_state[move_i][move_j] = next_state[move_i][move_j], next_state[empty_i][empty_j]
-                    
-                    # Calculate the cost to move to the next state
-                    g_next = g_current + next_state[empty_i][empty_j]
-                    h_next = weighted_mdistance(next_state)
+        while not priority_queue.empty():
+            _, g_current, (current_state, blank, h_current) = priority_queue.pop()
 
-                    if tuple(map(tuple, next_state)) not in visited:
-                        f_next = g_next + h_next
-                        next_path = current_path + [next_state]
-                        priority_queue.put((f_next, g_next, next_path))
+            # skip stale entries: the state was expanded already or a cheaper route was pushed after this one
+            if current_state in closed or g_current > best_g[current_state]:
+                duplicates += 1
+                continue
 
-    except TimeoutError:
-        signal.alarm(0) 
+            if is_complete(current_state, goal_state):
+                return 1, reconstruct_moves(parents, current_state), g_current
+
+            closed.add(current_state)
+            expanded += 1
+            if expanded >= next_check:
+                next_check = budget.check(expanded)
+
+            for next_state, next_blank, tile in layout.children(current_state, blank):
+                generated += 1
+                # Calculate the cost to move to the next state; only `tile` moved (from next_blank into blank)
+                g_next = g_current + tile
+
+                # the heuristic is consistent, so closed states never need reopening and an equal or better g makes this push pointless
+                # (weighted A* keeps its (1 + epsilon) bound without reopening too)
+                if next_state in closed or best_g.get(next_state, g_next + 1) <= g_next:
+                    duplicates += 1
+                    continue
+
+                best_g[next_state] = g_next
+                parents[next_state] = (current_state, tile)
+                h_next = update(h_current, current_state, next_state, tile, next_blank, blank)
+                priority_queue.push(g_next + weight * h_next, g_next, (next_state, next_blank, h_next))
+            if len(priority_queue) > peak_open:
+                peak_open = len(priority_queue)
+
+    except BudgetExhausted as exhausted:
         print("timeout exception")
-        return -1, []
+        stop_reason = exhausted.reason
+        return -1, [], None
+
+    finally:
+        if stats is not None:
+            # every expansion closes one state
+            stats.record(budget, expanded, generated, duplicates, stop_reason, peak_open, peak_closed=expanded)
 
-    signal.alarm(0)  
-    return -1, []
+    return -1, [], None
 
 
 
 
 if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Cheapest-total-cost solver; reads one puzzle from stdin")
+  parser.add_argument("--heuristic", default="weighted_manhattan", choices=list(PRICE_HEURISTICS))
+  parser.add_argument("--epsilon", type=float, default=0, help="accept solutions up to (1 + epsilon) times the cheapest")
+  parser.add_argument("--cache", metavar="PATH", help="sqlite file of solved boards to reuse and add to (see solution_cache.py)")
+  parser.add_argument("--stats", action="store_true", help="print search statistics as JSON on stderr")
+  args = parser.parse_args()
+  stats = SearchStats(time_heuristic=True) if args.stats else None
   try:
     n, m, initial_state = extract_initial_state_from_input()
     validate_dimensions(n, m)
@@ -88,11 +193,17 @@ if __name__ == "__main__":
         SystemExit
     
     else:
-        status, moves, total_cost = price(initial_state, n, m)
+        if args.cache:
+            status, moves, total_cost = SolutionCache(path=args.cache).solve("price", price, initial_state, n, m,
+                                                                             heuristic=args.heuristic, epsilon=args.epsilon, stats=stats)
+        else:
+            status, moves, total_cost = price(initial_state, n, m, heuristic=args.heuristic, epsilon=args.epsilon, stats=stats)
         if status == -1:
             print(status)
         elif status == 1:
          print(status, len(moves), *moves, f"£{total_cost}")
+        if stats is not None:
+            stats.report()
 
   except ValueError as e:
         print(f"Error: {e}")
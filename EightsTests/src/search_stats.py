@@ -0,0 +1,63 @@
+import json
+import sys
+import time
+from budget import resident_memory
+
+# Counters a solver fills in when the caller passes stats=SearchStats(), so we can see how much work a search did and
+# where the time went. Every solver takes stats=, and fills it in through record() whether it finishes, runs out of
+# budget or answers without searching. The CLIs print them as JSON on stderr with --stats, leaving the solution on
+# stdout as it was.
+
+
+class SearchStats:
+    def __init__(self, time_heuristic=False):
+        # timing every heuristic call costs two clock reads each, so it is only done when asked for
+        self._time_heuristic = time_heuristic
+        self.expanded = 0  # states taken off the open list and expanded
+        self.generated = 0  # children produced by those expansions
+        self.duplicates = 0  # children already closed or reached at no worse cost, plus stale entries skipped on pop
+        # the budget limit that ended the search early ("time", "expansions" or "memory"), or where the answer came from
+        # without searching ("table" for a distance table, "cache" for a SolutionCache); None for a search that ran to the end
+        self.stop_reason = None
+        self.peak_open = None  # most entries on the open list at once (stale ones included); None without an open list (IDA*)
+        self.peak_closed = None  # most states held in the closed or seen table; None without one
+        self.heuristic_seconds = None  # time spent computing h with time_heuristic=True; None when not timed
+        self.seconds = 0.0  # wall time of the search itself, not counting table loading
+        self.peak_memory = 0  # largest resident memory seen during the search, in bytes (sampled at the budget checks)
+
+    @property
+    def expansions_per_second(self):
+        return self.expanded / self.seconds if self.seconds else 0.0
+
+    def record(self, budget, expanded=0, generated=0, duplicates=0, stop_reason=None, peak_open=None, peak_closed=None):
+        """Store what a solver counted and the time and memory covered by its (started) budget. The solvers call this from
+        the finally block around their search, so a search stopped by its budget still reports its partial counts."""
+        self.expanded, self.generated, self.duplicates = expanded, generated, duplicates
+        self.stop_reason = stop_reason
+        self.peak_open, self.peak_closed = peak_open, peak_closed
+        self.seconds = budget.elapsed()
+        self.peak_memory = max(budget.peak_memory, resident_memory())
+
+    def as_dict(self):
+        fields = {name: value for name, value in vars(self).items() if not name.startswith("_")}
+        return dict(fields, expansions_per_second=self.expansions_per_second)
+
+    def report(self, file=None):
+        print(json.dumps(self.as_dict()), file=sys.stderr if file is None else file)
+
+
+def timed(function, stats):
+    """function itself, or for stats=SearchStats(time_heuristic=True) a wrapper that adds the time spent in each call to
+    stats.heuristic_seconds."""
+    if stats is None or not stats._time_heuristic:
+        return function
+    stats.heuristic_seconds = 0.0
+    clock = time.perf_counter
+
+    def wrapper(*args):
+        started = clock()
+        result = function(*args)
+        stats.heuristic_seconds += clock() - started
+        return result
+
+    return wrapper
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from budget import Budget
+from state import get_layout
+from symmetry import IDENTITY, canonical_state, restore_moves
+
+# Cache of solved boards, so a board that has been solved before is answered without searching. Entries are keyed by
+# (n, m, solver, heuristic, packed board) and hold the moves (plus the total cost for price). The most recently used
+# max_entries live in memory with least-recently-used eviction; with a path, every entry is also written to a sqlite
+# file that any number of processes can share, and a memory miss is looked up there before searching. Only solutions
+# are stored: a -1 can be a timeout, which a longer budget might turn into a solution. For the unit-cost solvers a square
+# board and its relabelled transpose share one entry (see symmetry.py), which halves the entries for random boards.
+#   cache = SolutionCache(path="solutions.sqlite")
+#   status, moves = cache.solve("astar", astar, initial_state, n, m, heuristic="manhattan")
+# astar.py, price.py and batch.py take --cache PATH.
+
+
+# solvers whose answers carry over between a board and its relabelled transpose; price's costs depend on tile values
+SYMMETRIC_SOLVERS = ("astar", "idastar", "bidirectional", "parallel_idastar", "manhattan")
+# the heuristic each solver uses when none is passed, so leaving it out (batch.py) and naming it (the CLIs) share entries
+DEFAULT_HEURISTICS = {"astar": "manhattan", "idastar": "manhattan", "parallel_idastar": "manhattan", "price": "weighted_manhattan"}
+
+
+class SolutionCache:
+    def __init__(self, max_entries=10000, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0  # answered from memory or disk
+        self.misses = 0  # had to search
+        self._entries = OrderedDict()
+        self._connection = None
+        self._connection_pid = None
+
+    def _database(self):
+        # one connection per process: sqlite connections can't be shared across a fork or pickled into a pool worker
+        if self.path is None:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions (n INTEGER, m INTEGER, solver TEXT, heuristic TEXT, board TEXT,"
+                " moves TEXT, cost INTEGER, PRIMARY KEY (n, m, solver, heuristic, board))")
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def __getstate__(self):
+        # a pickled copy (e.g. sent to another process) starts with an empty memory cache and opens its own connection
+        state = dict(self.__dict__)
+        state["_entries"], state["_connection"], state["_connection_pid"] = OrderedDict(), None, None
+        return state
+
+    def key(self, n, m, solver_name, heuristic, initial_state):
+        return n, m, solver_name, heuristic or "", get_layout(n, m).pack(initial_state)[0]
+
+    def get(self, key):
+        """The cached result for a key from key(), in the solver's own format, or None."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        database = self._database()
+        if database is None:
+            return None
+        n, m, solver_name, heuristic, packed = key
+        row = database.execute(
+            "SELECT moves, cost FROM solutions WHERE n = ? AND m = ? AND solver = ? AND heuristic = ? AND board = ?",
+            (n, m, solver_name, heuristic, format(packed, "x"))).fetchone()
+        if row is None:
+            return None
+        moves = [int(tile) for tile in row[0].split()]
+        result = (1, moves) if row[1] is None else (1, moves, row[1])
+        self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        self._remember(key, result)
+        database = self._database()
+        if database is not None:
+            n, m, solver_name, heuristic, packed = key
+            cost = result[2] if len(result) > 2 else None
+            with database:
+                database.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (n, m, solver_name, heuristic, format(packed, "x"), " ".join(map(str, result[1])), cost))
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def solve(self, solver_name, solver, initial_state, n, m, **options):
+        """solver(initial_state, n, m, **options), or the stored answer if this board has been solved before. A stored
+        answer fills options["stats"], if given, with stop_reason "cache" and the time the lookup took."""
+        stats = options.get("stats")
+        lookup = Budget()
+        lookup.start()
+        canonical, transform = initial_state, IDENTITY
+        if solver_name in SYMMETRIC_SOLVERS:
+            canonical, transform = canonical_state(initial_state, n, m)
+        heuristic = options.get("heuristic") or DEFAULT_HEURISTICS.get(solver_name)
+        if options.get("epsilon"):  # price's bounded-suboptimal answers are kept apart from its cheapest ones
+            heuristic = f"{heuristic or ''} epsilon={options['epsilon']}"
+        key = self.key(n, m, solver_name, heuristic, canonical)
+        result = self.get(key)
+        if result is not None:
+            self.hits += 1
+            if stats is not None:
+                stats.record(lookup, stop_reason="cache")
+            # restore_moves also copies, so a caller that edits the moves doesn't change the cached answer
+            return (result[0], restore_moves(result[1], transform, n, m), *result[2:])
+        self.misses += 1
+        result = solver(initial_state, n, m, **options)
+        if result[0] == 1:
+            self.put(key, (result[0], restore_moves(result[1], transform, n, m), *result[2:]))
+        return result
+
+    def counters(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,127 @@
+import contextlib
+import multiprocessing
+import queue
+import sys
+import time
+from collections import deque
+from batch import SOLVERS, solve_line
+from heuristics import get_heuristic
+from solution_cache import SolutionCache
+from state import get_layout
+
+# Process pool for solving batches of puzzles on every core. Each worker warms its caches (layouts, heuristic tables,
+# pattern databases) once when it starts, and every puzzle gets its own budget (timeout=..., budget=Budget(...)) from the
+# options passed to solve. Results come back in input order or as they finish. Used by batch.py --workers and by the
+# benchmark scripts (all_algo_comp.py, astar_vs_price.py). A SolutionCache given to the pool is recreated once in each
+# worker and kept there, so its sqlite connection and in-memory entries last across puzzles; tasks only carry its
+# path and size, never the cache itself.
+#
+#   with SolverPool(shapes=[(3, 3)]) as pool:
+#       for result, seconds in pool.solve("astar", [(3, 3, board) for board in boards]):
+#           ...
+
+# (path, max_entries) -> this worker's SolutionCache for those settings, for the life of the worker
+_caches = {}
+
+def _cache_settings(cache):
+    return None if cache is None else (cache.path, cache.max_entries)
+
+def _worker_cache(settings):
+    if settings is None:
+        return None
+    if settings not in _caches:
+        path, max_entries = settings
+        _caches[settings] = SolutionCache(max_entries, path)
+    return _caches[settings]
+
+def _initialise_worker(shapes, heuristic, cache_settings):
+    for n, m in shapes:
+        get_layout(n, m)
+        if heuristic is not None:
+            get_heuristic(heuristic, n, m)
+    _worker_cache(cache_settings)
+
+def _solve_task(task):
+    index, solver_name, n, m, initial_state, options = task
+    start_time = time.process_time()
+    # the solvers print "timeout exception" on stdout; keep it away from whatever the parent is writing there
+    with contextlib.redirect_stdout(sys.stderr):
+        result = SOLVERS[solver_name](initial_state, n, m, **options)
+    return index, result, time.process_time() - start_time
+
+def _solve_line_task(task):
+    index, line, solver_name, cache_settings, options = task
+    return index, solve_line(line, solver_name, _worker_cache(cache_settings), **options)
+
+class SolverPool:
+    def __init__(self, workers=None, shapes=(), heuristic=None, max_pending=None, cache=None):
+        # shapes/heuristic: tables to load in each worker up front; max_pending: most puzzles handed out but not yet
+        # yielded back; cache: SolutionCache that solve_lines uses by default, opened in each worker as it starts
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending or self.workers * 64
+        self.cache = cache
+        self._pool = multiprocessing.Pool(self.workers, initializer=_initialise_worker,
+                                          initargs=(tuple(shapes), heuristic, _cache_settings(cache)))
+
+    def _run(self, function, tasks, ordered):
+        # At most max_pending tasks are out at once, and the next one is only submitted as a result is taken, so an
+        # endless input never piles up in the pool's task queue. Unlike feeding fixed chunks, a slow puzzle only holds
+        # its own slot: the other workers carry on with the tasks behind it instead of idling until it finishes.
+        # Tasks are submitted from this generator, never by blocking inside the pool's own threads, so any number of
+        # solves on one pool can be iterated side by side, and a solve stopped early leaves nothing waiting.
+        tasks = iter(tasks)
+        if ordered:
+            pending = deque()
+            while True:
+                while len(pending) < self.max_pending:
+                    task = next(tasks, None)  # tasks are tuples, never None
+                    if task is None:
+                        break
+                    pending.append(self._pool.apply_async(function, (task,)))
+                if not pending:
+                    return
+                yield pending.popleft().get()
+        finished = queue.Queue()  # results (or the exceptions raised instead) as the pool's result thread receives them
+        out = 0
+        while True:
+            while out < self.max_pending:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                self._pool.apply_async(function, (task,), callback=finished.put, error_callback=finished.put)
+                out += 1
+            if not out:
+                return
+            result = finished.get()
+            out -= 1
+            if isinstance(result, BaseException):
+                raise result
+            yield result
+
+    def solve(self, solver_name, puzzles, ordered=True, **options):
+        """puzzles: iterable of (n, m, initial_state). Yields (result, process seconds) in input order, or
+        (index, result, process seconds) as they finish when ordered=False. options go to the solver, e.g. timeout=10."""
+        tasks = ((index, solver_name, n, m, state, options) for index, (n, m, state) in enumerate(puzzles))
+        for index, result, seconds in self._run(_solve_task, tasks, ordered):
+            yield (result, seconds) if ordered else (index, result, seconds)
+
+    def solve_lines(self, lines, solver_name="astar", ordered=True, cache=None, **options):
+        """Like batch.solve_stream: one result line per non-blank input line, or (index, line) pairs when ordered=False.
+        cache defaults to the pool's own."""
+        settings = _cache_settings(cache or self.cache)
+        tasks = ((index, line, solver_name, settings, options) for index, line in enumerate(line for line in lines if line.strip()))
+        for index, result in self._run(_solve_line_task, tasks, ordered):
+            yield result if ordered else (index, result)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self._pool.terminate()
@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+# Compact board representation shared by astar, manhattan and price.
+# A board is a single packed int: every cell gets a fixed number of bits (4 bits up to 4x4, 5 bits for 5x5,
+# wider for anything bigger) and cell 0 sits in the most significant bits, so comparing two packed boards gives
+# the same order as comparing the row-major lists. The blank index is carried next to the packed value by the
+# solvers, so applying a move and hashing a state are both O(1) and no lists are allocated per generated node.
+
+
+class Layout:
+    """Precomputed tables for an n x m board: bit widths, shifts, neighbour cells and the packed goal."""
+
+    def __init__(self, n, m):
+        self.n = n
+        self.m = m
+        self.size = n * m
+        self.bits = max(4, (self.size - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.shifts = tuple((self.size - 1 - cell) * self.bits for cell in range(self.size))
+        # same order as generate_child_nodes: up, down, left, right
+        neighbours = []
+        for cell in range(self.size):
+            i, j = divmod(cell, m)
+            adjacent = []
+            for move_i, move_j in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+                if 0 <= move_i < n and 0 <= move_j < m:
+                    adjacent.append(move_i * m + move_j)
+            neighbours.append(tuple(adjacent))
+        self.neighbours = tuple(neighbours)
+        self.goal = self.pack_flat(list(range(1, self.size)) + [0])
+        self.goal_blank = self.size - 1
+
+    def pack_flat(self, values):
+        packed = 0
+        for value in values:
+            packed = (packed << self.bits) | value
+        return packed
+
+    def pack(self, state):
+        # nested list -> (packed board, blank index)
+        values = [cell for row in state for cell in row]
+        return self.pack_flat(values), values.index(0)
+
+    def unpack_flat(self, packed):
+        return [(packed >> shift) & self.mask for shift in self.shifts]
+
+    def unpack(self, packed):
+        values = self.unpack_flat(packed)
+        return [values[i * self.m : i * self.m + self.m] for i in range(self.n)]
+
+    def tile_at(self, packed, cell):
+        return (packed >> self.shifts[cell]) & self.mask
+
+    def find_blank(self, packed):
+        # only needed when a caller has a packed board without its blank index
+        for cell, shift in enumerate(self.shifts):
+            if not (packed >> shift) & self.mask:
+                return cell
+        return None
+
+    def slide(self, packed, blank, cell):
+        # the tile at `cell` moves into the blank; the blank ends up at `cell`
+        tile = (packed >> self.shifts[cell]) & self.mask
+        return packed + (tile << self.shifts[blank]) - (tile << self.shifts[cell])
+
+    def children(self, packed, blank):
+        # yields (child board, new blank index, tile that moved) for every legal move
+        for cell in self.neighbours[blank]:
+            tile = (packed >> self.shifts[cell]) & self.mask
+            yield packed + (tile << self.shifts[blank]) - (tile << self.shifts[cell]), cell, tile
+
+
+@lru_cache(maxsize=None)
+def get_layout(n, m):
+    return Layout(n, m)
@@ -0,0 +1,47 @@
+from functools import lru_cache
+
+# Transpose symmetry of square boards. Reflecting an n x n board in its main diagonal keeps the blank's goal cell (the
+# bottom-right corner) where it is, and relabelling every tile with the tile whose goal is the reflected goal cell
+# turns the goal back into itself. So a board and its relabelled transpose are the same puzzle: a move sequence solves
+# one exactly when the relabelled sequence solves the other, with the same length and the same Manhattan distance
+# along the way. Tile values change, so this does not hold for price's cost.
+#
+# canonical_state picks one representative per pair, so caches keyed by board store half as many entries:
+#   canonical, transform = canonical_state(initial_state, n, m)
+#   moves = restore_moves(solve(canonical), transform, n, m)
+
+IDENTITY, TRANSPOSE = 0, 1
+
+
+@lru_cache(maxsize=None)
+def transpose_maps(n):
+    # (cells, tiles): cells[c] is the reflection of cell c, and tiles[t] the tile whose goal is the reflection of t's goal
+    cells = tuple((cell % n) * n + cell // n for cell in range(n * n))
+    tiles = (0,) + tuple(cells[tile - 1] + 1 for tile in range(1, n * n))
+    return cells, tiles
+
+
+def transpose_state(state):
+    """The relabelled transpose of a square board (nested lists), which is its own inverse."""
+    n = len(state)
+    _, tiles = transpose_maps(n)
+    return [[tiles[state[i][j]] for i in range(n)] for j in range(n)]
+
+
+def canonical_state(state, n, m):
+    """(representative, transform): the smaller of the board and its relabelled transpose in row-major order (the
+    order packed boards compare in), and which transform gives it. Boards that aren't square are their own representative."""
+    if n != m:
+        return state, IDENTITY
+    transposed = transpose_state(state)
+    if transposed < state:
+        return transposed, TRANSPOSE
+    return state, IDENTITY
+
+
+def restore_moves(moves, transform, n, m):
+    """Map moves that solve the representative back to moves that solve the original board (and vice versa)."""
+    if transform == IDENTITY:
+        return list(moves)
+    _, tiles = transpose_maps(n)
+    return [tiles[tile] for tile in moves]
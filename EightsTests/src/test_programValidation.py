@@ -1,11 +1,28 @@
 
 import io
+import json
+import random
 import sys
+import threading
 import pytest
 from PuzzleSolver import *
 from manhattan import manhattan_search , timeout_handler
 from astar import astar
-from price import price, weighted_mdistance
+from idastar import idastar
+from parallel_idastar import parallel_idastar
+from bidirectional import bidirectional_astar
+from batch import solve_line, solve_stream
+from solver_pool import SolverPool
+from solution_cache import SolutionCache
+from symmetry import TRANSPOSE, canonical_state, restore_moves, transpose_state
+from distance_table import build_distance_table, permutation_rank, save_distance_table, load_distance_table, table_solve
+from price import price, weighted_line_conflicts, weighted_mdistance, weighted_mdistance_table
+from state import get_layout
+from open_list import BucketQueue, HeapQueue
+from search_stats import SearchStats
+from budget import Budget, BudgetExhausted
+from pattern_database import PatternDatabase, rank_positions, unrank_positions
+from heuristics import HEURISTICS, get_heuristic, line_conflicts
 
 """PuzzleSolver.py tests"""
 
@@ -25,6 +42,92 @@ def test_is_solvable():
     assert is_solvable(solvable_state, 3) == True
     assert is_solvable(unsolvable_state, 3) == False
 
+"""Test to ensure that is_solvable compares against the goal's blank row on boards with an odd number of rows and an
+ even width, where the goal itself used to be rejected"""
+def test_is_solvable_odd_rows_even_width():
+    for n, m in [(3, 4), (3, 2), (5, 4), (1, 2)]:
+        assert is_solvable(generate_goal_state(n, m), m)
+    initial_state = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 0, 11]]
+    assert is_solvable(initial_state, 4)
+    assert not is_solvable([[1, 2, 3, 4], [5, 6, 7, 8], [10, 9, 0, 11]], 4)
+    assert astar(initial_state, 3, 4) == (1, [11])
+
+def _parallel_idastar_two_workers(initial_state, n, m, **options):
+    return parallel_idastar(initial_state, n, m, workers=2, **options)
+
+def _anytime(initial_state, n, m, **options):
+    from anytime import anytime
+    return anytime(initial_state, n, m, **options)
+
+"""Test to ensure that the solvers which reject unsolvable boards up front with is_solvable still solve boards with an
+ odd number of rows and an even width, optimally and with a real search"""
+@pytest.mark.parametrize("solver", [idastar, bidirectional_astar, _parallel_idastar_two_workers, _anytime],
+                         ids=["idastar", "bidirectional", "parallel_idastar", "anytime"])
+def test_solvers_odd_rows_even_width(solver):
+    assert solver([[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 0, 11]], 3, 4) == (1, [11])
+    initial_state = random_walk_state(3, 4, 20, random.Random(3))
+    stats = SearchStats()
+    status, moves = solver(initial_state, 3, 4, stats=stats)
+    assert status == 1 and stats.expanded > 0
+    assert apply_moves_to_state(initial_state, moves) == generate_goal_state(3, 4)
+    assert len(moves) == len(astar(initial_state, 3, 4)[1])
+
+"""Test to ensure that the O(k) cycle parity agrees with the inversion count, that is_solvable takes packed boards,
+ and that the NumPy bulk check agrees with is_solvable on every board of a batch"""
+def test_inversion_parity():
+    for size in range(2, 30):
+        values = list(range(size))
+        random.shuffle(values)
+        assert inversion_parity(values) == count_inversions(values) % 2
+    for n, m in [(3, 3), (4, 4), (3, 4), (2, 5), (1, 4)]:
+        layout = get_layout(n, m)
+        boards = []
+        for _ in range(50):
+            values = list(range(n * m))
+            random.shuffle(values)
+            boards.append([values[i * m:(i + 1) * m] for i in range(n)])
+        expected = [is_solvable(board, m) for board in boards]
+        assert [is_solvable(layout.pack(board)[0], m, layout) for board in boards] == expected
+        pytest.importorskip("numpy")
+        from vectorized import solvable_mask
+        assert solvable_mask(boards, n, m).tolist() == expected
+
+"""Test to ensure that the random board generators only give solvable boards, reach every solvable 2x2 board,
+ repeat themselves for the same seed, and that random walks stay within their depth of the goal"""
+def test_random_boards():
+    boards = {tuple(map(tuple, random_solvable_state(2, 2))) for _ in range(500)}
+    assert len(boards) == 12
+    assert all(is_solvable(board, 2) for board in boards)
+    assert [random_solvable_state(4, 4, random.Random(5)) for _ in range(2)] == [random_solvable_state(4, 4, random.Random(5))] * 2
+    for _ in range(5):
+        initial_state = random_walk_state(3, 3, 8)
+        assert len(astar(initial_state, 3, 3)[1]) <= 8
+    pytest.importorskip("numpy")
+    from vectorized import random_solvable_boards, random_walk_boards, solvable_mask
+    batch = random_solvable_boards(200, 4, 3, seed=1)
+    assert solvable_mask(batch, 4, 3).all()
+    assert (batch == random_solvable_boards(200, 4, 3, seed=1)).all()
+    for row in random_walk_boards(5, 3, 3, 8, seed=2):
+        initial_state = [row[i * 3:(i + 1) * 3].tolist() for i in range(3)]
+        assert len(astar(initial_state, 3, 3)[1]) <= 8
+
+"""Test to ensure that the sampled boards are really solvable on shapes with an odd number of rows and an even width,
+ by solving them"""
+def test_random_boards_odd_rows_even_width():
+    rng = random.Random(7)
+    for n, m in [(3, 4), (3, 2)]:
+        for _ in range(4):
+            initial_state = random_solvable_state(n, m, rng)
+            status, moves = astar(initial_state, n, m, heuristic="linear_conflict")
+            assert status == 1
+            assert apply_moves_to_state(initial_state, moves) == generate_goal_state(n, m)
+    pytest.importorskip("numpy")
+    from vectorized import random_solvable_boards
+    for n, m in [(3, 4), (3, 2)]:
+        for row in random_solvable_boards(4, n, m, seed=7):
+            initial_state = [row[i * m:(i + 1) * m].tolist() for i in range(n)]
+            assert astar(initial_state, n, m, heuristic="linear_conflict")[0] == 1
+
 """Test to ensure that the manhattan_distance function correctly calculates 
  the Manhattan distance for a given puzzle state"""
 def test_manhattan_distance():
@@ -68,6 +171,95 @@ def test_generate_goal_state():
 
 
 
+""" Test to ensure that packing a board and unpacking it again gives back the same nested list,
+ and that the blank index is recorded"""
+def test_pack_unpack_state():
+    layout = get_layout(3, 3)
+    state = [
+        [1, 2, 3],
+        [4, 0, 6],
+        [7, 5, 8]
+    ]
+    packed, blank = layout.pack(state)
+    assert blank == 4
+    assert layout.unpack(packed) == state
+    assert layout.pack(generate_goal_state(3, 3)) == (layout.goal, layout.goal_blank)
+
+
+""" Test to ensure that sliding a tile on a packed board matches the list-of-lists move,
+ and that the packed helpers in PuzzleSolver agree with the nested list versions"""
+def test_packed_children():
+    layout = get_layout(3, 3)
+    state = [
+        [1, 2, 3],
+        [4, 0, 6],
+        [7, 5, 8]
+    ]
+    packed, blank = layout.pack(state)
+    assert {tile for _child, _cell, tile in layout.children(packed, blank)} == {2, 4, 6, 5}
+    moved = layout.slide(packed, blank, 7)
+    assert layout.unpack(moved) == apply_moves_to_state(state, [5])
+    assert extract_moves([packed, moved], layout) == [5]
+    assert manhattan_distance(packed, layout) == manhattan_distance(state)
+    empty_i, empty_j, possible_moves = generate_child_nodes(packed, layout)
+    assert (empty_i, empty_j) == (1, 1)
+    assert set(possible_moves) == {(0, 1), (1, 0), (1, 2), (2, 1)}
+
+
+
+""" Test to ensure that reconstruct_moves walks the parent table back to the start state
+ and returns the moved tiles in the order they were played"""
+def test_reconstruct_moves():
+    parents = {"start": None, "a": ("start", 6), "b": ("a", 8), "goal": ("b", 5)}
+    assert reconstruct_moves(parents, "goal") == [6, 8, 5]
+    assert reconstruct_moves(parents, "start") == []
+
+
+
+""" Test to ensure that updating h from the single moved tile gives the same value as rescanning the board,
+ for both the plain and the price-weighted Manhattan tables"""
+def test_update_heuristic_matches_full_scan():
+    layout = get_layout(3, 4)
+    state = random_solvable_state(3, 4)
+    packed, blank = layout.pack(state)
+    for table, full in ((manhattan_table(3, 4), manhattan_distance), (weighted_mdistance_table(3, 4), weighted_mdistance)):
+        h = full(packed, layout)
+        assert h == full(state)
+        for child, cell, tile in layout.children(packed, blank):
+            assert update_heuristic(h, tile, cell, blank, table) == full(child, layout)
+
+
+
+""" Test to ensure that both open lists pop the lowest f first, break ties towards the larger g,
+ peek at the same entry they pop next, and agree with each other on the same sequence of pushes"""
+def test_open_lists_pop_order():
+    pushes = [(5, 1, "a"), (3, 0, "b"), (5, 3, "c"), (3, 2, "d"), (4, 4, "e"), (3, 2, "f")]
+    expected = [(3, 2, "f"), (3, 2, "d"), (3, 0, "b"), (4, 4, "e"), (5, 3, "c"), (5, 1, "a")]
+    for open_list in (BucketQueue, HeapQueue):
+        queue = open_list()
+        for f, g, item in pushes:
+            queue.push(f, g, item)
+        assert len(queue) == len(pushes)
+        popped = []
+        for _ in pushes:
+            next_key = queue.peek()
+            popped.append(queue.pop())
+            assert popped[-1][:2] == next_key
+        assert popped == expected
+        assert queue.empty()
+
+""" Test to ensure that the bucket queue still finds a lower f pushed after a pop"""
+def test_bucket_queue_push_below_current_min():
+    queue = BucketQueue()
+    queue.push(6, 0, "x")
+    queue.push(7, 0, "y")
+    assert queue.pop() == (6, 0, "x")
+    queue.push(2, 1, "z")
+    assert queue.pop() == (2, 1, "z")
+    assert queue.pop() == (7, 0, "y")
+
+
+
 """The following are very basic input validation specific tests that probably require more testing to be thorough,
  but due to time constraints i mainly tested 3x3 grid inputs"""
 
@@ -165,6 +357,17 @@ def test_unsolvable_state_manhattan():
 """The following are A* specific tests"""
 
 
+""" Test to ensure that astar never expands a state twice: on an unsolvable 2x2 board the whole reachable
+half of the state space (12 states) is expanded exactly once and every other child is counted as a duplicate"""
+def test_closed_set_astar():
+    stats = SearchStats()
+    status, _ = astar([[2, 1], [3, 0]], 2, 2, stats=stats, use_table=False)
+    assert status == -1
+    assert stats.expanded == 12
+    assert stats.generated == 24
+    assert stats.duplicates == stats.generated - (stats.expanded - 1)
+
+
 """ Test to ensure that the solution produced by astar correctly 
 transforms a given initial state to the goal state when the moves are applied"""    
 
@@ -212,6 +415,366 @@ def test_unsolvable_state_astar():
     assert status == -1
 
 
+"""The following are pattern database tests"""
+
+""" Test to ensure that placements of pattern tiles rank to distinct indices and unrank back again"""
+def test_rank_unrank_positions():
+    indices = set()
+    for index in range(9 * 8 * 7):
+        positions = unrank_positions(index, 9, 3)
+        assert rank_positions(positions, 9) == index
+        indices.add(tuple(positions))
+    assert len(indices) == 9 * 8 * 7
+
+""" Test to ensure that the additive pattern database is zero at the goal, never below Manhattan distance,
+ never above the optimal solution length, and that its incremental update matches a full evaluation"""
+def test_pattern_database_admissible(tmp_path):
+    pdb = PatternDatabase(3, 3, directory=str(tmp_path))
+    layout = get_layout(3, 3)
+    assert pdb.evaluate(layout.goal) == 0
+    initial_state = random_solvable_state(3, 3)
+    packed, blank = layout.pack(initial_state)
+    h = pdb.evaluate(packed)
+    assert manhattan_distance(initial_state) <= h <= len(astar(initial_state, 3, 3)[1])
+    where = [0] * 9
+    for cell, tile in enumerate(layout.unpack_flat(packed)):
+        where[tile] = cell
+    for child, cell, tile in layout.children(packed, blank):
+        assert pdb.update(h, where, tile, blank) == pdb.evaluate(child)
+
+""" Test to ensure that loading without build fails straight away on a missing table, naming the command that builds it"""
+def test_pattern_database_missing_table(tmp_path):
+    with pytest.raises(FileNotFoundError, match="python pattern_database.py 3 3"):
+        PatternDatabase(3, 3, directory=str(tmp_path), build=False)
+    assert not list(tmp_path.iterdir())
+
+@pytest.fixture
+def pdb_tables(tmp_path, monkeypatch):
+    """The solvers only load pattern tables, so build the default 3x3 ones in tmp_path and point the solvers there,
+    leaving the source tree's tables/ directory alone"""
+    import pattern_database
+    monkeypatch.setattr(pattern_database, "TABLE_DIR", str(tmp_path))
+    get_heuristic.cache_clear()  # drop heuristics holding tables from elsewhere
+    PatternDatabase(3, 3)
+    yield
+    get_heuristic.cache_clear()
+
+""" Test to ensure that astar and idastar still find optimal solutions with the pattern database heuristic"""
+def test_solvers_with_pattern_database(pdb_tables):
+    initial_state = random_solvable_state(3, 3)
+    optimal = len(astar(initial_state, 3, 3)[1])
+    for solver in (astar, idastar):
+        status, moves = solver(initial_state, 3, 3, heuristic="pdb")
+        assert status == 1
+        assert len(moves) == optimal
+        assert apply_moves_to_state(initial_state, moves) == generate_goal_state(3, 3)
+
+
+"""The following are heuristic registry tests"""
+
+""" Test to ensure that line_conflicts counts the fewest tiles that must leave a line"""
+def test_line_conflicts():
+    assert line_conflicts([]) == 0
+    assert line_conflicts([0, 1, 2]) == 0
+    assert line_conflicts([1, 0]) == 1
+    assert line_conflicts([2, 1, 0]) == 2
+    assert line_conflicts([1, 2, 0]) == 1
+
+""" Test to ensure that every registered heuristic is 0 at the goal, its incremental update agrees with a full
+ evaluation, and it never overestimates the optimal solution length"""
+def test_registered_heuristics(pdb_tables):
+    layout = get_layout(3, 3)
+    initial_state = random_solvable_state(3, 3)
+    packed, blank = layout.pack(initial_state)
+    optimal = len(astar(initial_state, 3, 3)[1])
+    for name in HEURISTICS:
+        heuristic = get_heuristic(name, 3, 3)
+        assert heuristic.evaluate(layout.goal) == 0
+        h = heuristic.evaluate(packed)
+        assert manhattan_distance(initial_state) <= h <= optimal
+        for child, cell, tile in layout.children(packed, blank):
+            assert heuristic.update(h, packed, child, tile, cell, blank) == heuristic.evaluate(child)
+
+""" Test to ensure that astar finds optimal solutions with every registered heuristic and rejects unknown names"""
+def test_astar_heuristic_choice(pdb_tables):
+    initial_state = random_solvable_state(3, 3)
+    optimal = len(astar(initial_state, 3, 3)[1])
+    for name in HEURISTICS:
+        status, moves = astar(initial_state, 3, 3, heuristic=name)
+        assert status == 1
+        assert len(moves) == optimal
+    with pytest.raises(ValueError):
+        astar(initial_state, 3, 3, heuristic="euclidean")
+
+
+"""The following are distance table tests"""
+
+""" Test to ensure that permutation_rank numbers all orderings from 0 to k! - 1"""
+def test_permutation_rank():
+    from itertools import permutations
+    ranks = [permutation_rank(list(order)) for order in permutations(range(4))]
+    assert ranks == list(range(24))
+
+""" Test to ensure that the 2x3 distance table covers exactly the solvable half of the boards,
+ and that solving by descent through a saved table matches astar"""
+def test_distance_table(tmp_path):
+    table = build_distance_table(2, 3)
+    assert sum(1 for distance in table if distance != 255) == 360
+    save_distance_table(3, 3, str(tmp_path))
+    table = load_distance_table(3, 3, str(tmp_path))
+    initial_state = random_solvable_state(3, 3)
+    status, moves = table_solve(initial_state, 3, 3, table)
+    assert status == 1
+    assert apply_moves_to_state(initial_state, moves) == generate_goal_state(3, 3)
+    assert len(moves) == len(astar(initial_state, 3, 3, use_table=False)[1])
+    assert table_solve([[1, 2, 3], [4, 5, 6], [8, 7, 0]], 3, 3, table) == (-1, [])
+
+""" Test to ensure that astar answers from a built table, marks its stats as a table lookup, and that use_table=False
+ still runs a real search"""
+def test_astar_distance_table_stats(tmp_path, monkeypatch):
+    import astar as astar_module
+    save_distance_table(3, 3, str(tmp_path))
+    table = load_distance_table(3, 3, str(tmp_path))
+    monkeypatch.setattr(astar_module, "load_distance_table", lambda n, m: table)
+    initial_state = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+    stats = SearchStats()
+    status, moves = astar(initial_state, 3, 3, stats=stats)
+    assert status == 1 and len(moves) == 31
+    assert stats.stop_reason == "table" and stats.expanded == 0 and stats.seconds > 0
+    # a heuristic whose tables are missing is never loaded when the table answers
+    monkeypatch.setattr(astar_module, "get_heuristic", lambda *args: pytest.fail("loaded a heuristic"))
+    assert len(astar(initial_state, 3, 3, heuristic="pdb")[1]) == 31
+    monkeypatch.undo()
+    stats = SearchStats()
+    assert len(astar(initial_state, 3, 3, stats=stats, use_table=False)[1]) == 31
+    assert stats.stop_reason is None and stats.expanded > 0
+
+
+"""The following are batch mode tests"""
+
+""" Test to ensure that batch mode gives one result line per puzzle in the single-puzzle CLI formats,
+ skipping blank lines and reporting bad lines without stopping"""
+def test_batch_solve_stream():
+    lines = ["3 3 1 2 3 4 5 6 7 8 0\n", "\n", "3 3 1 2 3 4 5 6 7 0 8\n", "3 3 1 2 3 4 5 6 8 7 0\n", "3 3 1 2 3\n"]
+    results = list(solve_stream(iter(lines), "astar"))
+    assert results[:3] == ["1 0", "1 1 8", "0"]
+    assert results[3].startswith("Error:")
+    assert solve_line("3 3 1 2 3 4 5 6 7 0 8", "price") == "1 1 8 £8"
+    assert solve_line("2 2 1 2 0 3", "idastar") == "1 1 3"
+
+""" Test to ensure that the process pool gives the same answers as solving in one process, in input order,
+ and that unordered results carry the index of their puzzle"""
+def test_solver_pool():
+    lines = ["3 3 1 2 3 4 5 6 7 0 8", "3 3 1 2 3 4 5 6 8 7 0", "bad", "3 3 8 6 7 2 5 4 3 0 1"]
+    puzzles = [(3, 3, random_solvable_state(3, 3)) for _ in range(6)]
+    with SolverPool(2, shapes=[(3, 3)], max_pending=4) as pool:
+        assert list(pool.solve_lines(lines, "astar")) == list(solve_stream(lines, "astar"))
+        results = [result for result, _seconds in pool.solve("astar", puzzles, timeout=30)]
+        unordered = sorted(pool.solve("idastar", puzzles, ordered=False))
+    assert [index for index, _result, _seconds in unordered] == list(range(6))
+    for (_, _, initial_state), (status, moves), (_, (_, ida_moves), _) in zip(puzzles, results, unordered):
+        assert status == 1
+        assert is_complete(apply_moves_to_state(initial_state, moves), generate_goal_state(3, 3))
+        assert len(moves) == len(ida_moves)
+
+""" Test to ensure that two solves on one pool can be read side by side, each with more puzzles than max_pending,
+ instead of one waiting forever for the other to free a slot"""
+def test_solver_pool_interleaved_solves():
+    puzzles = [(3, 3, random_walk_state(3, 3, 12, random.Random(seed))) for seed in range(10)]
+    with SolverPool(1, max_pending=4) as pool:
+        pairs = list(zip(pool.solve("astar", puzzles), pool.solve("price", puzzles)))
+        unordered = list(zip(pool.solve("astar", puzzles, ordered=False), pool.solve("idastar", puzzles, ordered=False)))
+    assert len(pairs) == len(unordered) == 10
+    for (_, _, initial_state), ((astar_result, _), (price_result, _)) in zip(puzzles, pairs):
+        assert astar_result[0] == price_result[0] == 1
+        assert is_complete(apply_moves_to_state(initial_state, astar_result[1]), generate_goal_state(3, 3))
+        assert price_result[2] == sum(price_result[1])
+    assert sorted(index for (index, _, _), _ in unordered) == sorted(index for _, (index, _, _) in unordered) == list(range(10))
+
+""" Test to ensure that a puzzle running into its timeout only holds its own slot: the quick puzzles queued behind it
+ all finish first instead of waiting for it, and stopping early does not hang the pool"""
+def test_solver_pool_keeps_workers_busy():
+    puzzles = [(5, 5, random_solvable_state(5, 5, random.Random(1)))] + [(3, 3, [[1, 2, 3], [4, 5, 6], [7, 0, 8]])] * 10
+    with SolverPool(2, max_pending=4) as pool:
+        finished = [(index, result) for index, result, _seconds in pool.solve("astar", puzzles, ordered=False, timeout=2)]
+        assert finished[-1] == (0, (-1, []))
+        assert sorted(index for index, _ in finished) == list(range(11))
+        assert next(pool.solve("astar", puzzles[1:] * 10))[0] == (1, [8])
+
+
+""" Test to ensure that the solution cache answers repeated boards without searching, counts hits and misses,
+ evicts the least recently used board, and shares solutions (with price's cost) through its sqlite file"""
+def test_solution_cache(tmp_path):
+    boards = [random_solvable_state(3, 3) for _ in range(3)]
+    calls = []
+    def counting_astar(initial_state, n, m, **options):
+        calls.append(initial_state)
+        return astar(initial_state, n, m, **options)
+    cache = SolutionCache(max_entries=2)
+    first = cache.solve("astar", counting_astar, boards[0], 3, 3, heuristic="manhattan")
+    assert cache.solve("astar", counting_astar, boards[0], 3, 3, heuristic="manhattan") == first
+    assert (cache.hits, cache.misses, len(calls)) == (1, 1, 1)
+    cache.solve("astar", counting_astar, boards[1], 3, 3, heuristic="manhattan")
+    cache.solve("astar", counting_astar, boards[2], 3, 3, heuristic="manhattan")
+    cache.solve("astar", counting_astar, boards[0], 3, 3, heuristic="manhattan")
+    assert len(calls) == 4 and cache.counters()["entries"] == 2
+
+    path = str(tmp_path / "solutions.sqlite")
+    result = SolutionCache(path=path).solve("price", price, boards[0], 3, 3)
+    shared = SolutionCache(path=path)
+    assert shared.solve("price", lambda *args: pytest.fail("searched a stored board"), boards[0], 3, 3) == result
+    assert shared.hits == 1 and len(result) == 3
+    assert solve_line("3 3 1 2 3 4 5 6 7 0 8", "astar", shared) == "1 1 8"
+
+""" Test to ensure that leaving out the heuristic and naming the solver's default one share a cache entry, as batch.py
+ and the price CLI do"""
+def test_solution_cache_default_heuristic():
+    initial_state = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+    cache = SolutionCache()
+    searched = lambda *args, **options: pytest.fail("searched a stored board")
+    result = cache.solve("price", price, initial_state, 3, 3)
+    assert cache.solve("price", searched, initial_state, 3, 3, heuristic="weighted_manhattan") == result
+    cache.solve("astar", astar, initial_state, 3, 3, heuristic="manhattan")
+    assert cache.solve("astar", searched, initial_state, 3, 3)[0] == 1
+    assert cache.hits == 2 and cache.misses == 2
+
+""" Test to ensure that a pool's workers each keep one solution cache for the settings they are sent, and that what they
+ solve ends up in the shared sqlite file"""
+def test_solver_pool_cache(tmp_path):
+    import solver_pool
+    path = str(tmp_path / "solutions.sqlite")
+    lines = ["3 3 1 2 3 4 5 6 7 0 8", "3 3 8 6 7 2 5 4 3 0 1"]
+    with SolverPool(2, shapes=[(3, 3)], cache=SolutionCache(path=path)) as pool:
+        assert list(pool.solve_lines(lines * 2, "astar")) == list(solve_stream(lines * 2, "astar"))
+    stored = SolutionCache(path=path)
+    assert stored.solve("astar", lambda *args: pytest.fail("searched a stored board"), [[8, 6, 7], [2, 5, 4], [3, 0, 1]], 3, 3)[0] == 1
+    settings = solver_pool._cache_settings(stored)
+    assert solver_pool._worker_cache(settings) is solver_pool._worker_cache(settings)
+    solver_pool._caches.clear()
+
+
+""" Test to ensure that a board and its relabelled transpose are the same puzzle, that both map to one canonical
+ board, and that the cache answers the second from the first's solution"""
+def test_transpose_symmetry():
+    assert transpose_state(generate_goal_state(4, 4)) == generate_goal_state(4, 4)
+    initial_state = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+    transposed = transpose_state(initial_state)
+    assert transpose_state(transposed) == initial_state
+    assert canonical_state(initial_state, 3, 3)[0] == canonical_state(transposed, 3, 3)[0]
+    assert canonical_state([[1, 2, 3], [4, 5, 6]], 2, 3) == ([[1, 2, 3], [4, 5, 6]], 0)
+    _, moves = astar(initial_state, 3, 3)
+    assert is_complete(apply_moves_to_state(transposed, restore_moves(moves, TRANSPOSE, 3, 3)), generate_goal_state(3, 3))
+    cache = SolutionCache()
+    cache.solve("astar", astar, initial_state, 3, 3)
+    status, moves = cache.solve("astar", astar, transposed, 3, 3)
+    assert cache.hits == 1 and status == 1 and len(moves) == 31
+    assert is_complete(apply_moves_to_state(transposed, moves), generate_goal_state(3, 3))
+
+
+"""The following are search budget tests"""
+
+""" Test to ensure that every solver stops at the expansion cap of a budget, prints "timeout exception",
+ returns -1 and reports the partial counters and the reason it stopped"""
+def test_budget_expansion_limit():
+    initial_state = [[8, 6, 7], [2, 5, 4], [3, 0, 1]]
+    solvers = [lambda **kw: astar(initial_state, 3, 3, use_table=False, **kw), lambda **kw: idastar(initial_state, 3, 3, **kw),
+               lambda **kw: bidirectional_astar(initial_state, 3, 3, **kw), lambda **kw: price(initial_state, 3, 3, **kw)]
+    for solve in solvers:
+        stats = SearchStats()
+        capturedOutput = io.StringIO()
+        sys.stdout = capturedOutput
+        result = solve(stats=stats, budget=Budget(max_expansions=50, check_every=8))
+        sys.stdout = sys.__stdout__
+        assert result[:2] == (-1, []) and result[2:] in ((), (None,))
+        assert "timeout exception" in capturedOutput.getvalue()
+        assert stats.expanded == 50 and stats.stop_reason == "expansions"
+    stats = SearchStats()
+    assert astar(initial_state, 3, 3, use_table=False, stats=stats)[0] == 1
+    assert stats.stop_reason is None
+
+""" Test to ensure that budgets check the clock and memory, and that a solver can time out outside the main thread,
+ which SIGALRM never allowed"""
+def test_budget_time_and_memory():
+    with pytest.raises(BudgetExhausted) as exhausted:
+        Budget(max_memory=1).check(1)
+    assert exhausted.value.reason == "memory"
+    budget = Budget(seconds=0)
+    budget.start()
+    with pytest.raises(BudgetExhausted) as exhausted:
+        budget.check(1)
+    assert exhausted.value.reason == "time"
+
+    results = []
+    stats = SearchStats()
+    thread = threading.Thread(target=lambda: results.append(manhattan_search(random_solvable_state(10, 10), 10, 10, stats=stats, timeout=0.2)))
+    thread.start()
+    thread.join(10)
+    assert results == [(-1, [])] and stats.stop_reason == "time"
+
+
+"""The following are IDA* specific tests"""
+
+""" Test to ensure that idastar solves a random board and finds a solution as short as the one astar finds"""
+def test_apply_moves_idastar():
+    initial_state = random_solvable_state(3, 3)
+    status, moves = idastar(initial_state, 3, 3)
+    assert status == 1
+    assert apply_moves_to_state(initial_state, moves) == generate_goal_state(3, 3)
+    assert len(moves) == len(astar(initial_state, 3, 3)[1])
+
+""" Test to ensure that idastar handles 4x4 boards and already solved and unsolvable boards the same way astar does"""
+def test_idastar_edge_cases():
+    initial_state = [
+        [5, 1, 2, 3],
+        [9, 6, 7, 4],
+        [13, 10, 11, 8],
+        [0, 14, 15, 12]
+    ]
+    assert idastar(initial_state, 4, 4) == (1, [13, 9, 5, 1, 2, 3, 4, 8, 12])
+    assert idastar(generate_goal_state(3, 3), 3, 3) == (1, [])
+    assert idastar([[1, 2, 3], [4, 5, 6], [8, 7, 0]], 3, 3) == (-1, [])
+
+
+
+""" Test to ensure that the parallel IDA* finds solutions as short as astar's, including boards solved while the
+ frontier is still being split, and stops at an expansion budget"""
+def test_parallel_idastar():
+    for _ in range(3):
+        initial_state = random_solvable_state(3, 3)
+        status, moves = parallel_idastar(initial_state, 3, 3, workers=2)
+        assert status == 1
+        assert is_complete(apply_moves_to_state(initial_state, moves), generate_goal_state(3, 3))
+        assert len(moves) == len(astar(initial_state, 3, 3)[1])
+    assert parallel_idastar([[1, 2, 3], [4, 5, 6], [0, 7, 8]], 3, 3, workers=2) == (1, [7, 8])
+    stats = SearchStats()
+    capturedOutput = io.StringIO()
+    sys.stdout = capturedOutput
+    result = parallel_idastar([[8, 6, 7], [2, 5, 4], [3, 0, 1]], 3, 3, workers=2, stats=stats, budget=Budget(max_expansions=100))
+    sys.stdout = sys.__stdout__
+    assert result == (-1, []) and stats.stop_reason == "expansions"
+    assert "timeout exception" in capturedOutput.getvalue()
+
+
+
+"""The following are bidirectional search tests"""
+
+""" Test to ensure that the bidirectional search returns a valid solution of optimal length, stitched together
+ from both directions into one move list"""
+def test_apply_moves_bidirectional():
+    initial_state = random_solvable_state(3, 3)
+    status, moves = bidirectional_astar(initial_state, 3, 3)
+    assert status == 1
+    assert apply_moves_to_state(initial_state, moves) == generate_goal_state(3, 3)
+    assert len(moves) == len(astar(initial_state, 3, 3)[1])
+
+""" Test to ensure that the bidirectional search handles solved, one-move and unsolvable boards"""
+def test_bidirectional_edge_cases():
+    assert bidirectional_astar(generate_goal_state(3, 3), 3, 3) == (1, [])
+    assert bidirectional_astar([[1, 2, 3], [4, 5, 6], [7, 0, 8]], 3, 3) == (1, [8])
+    assert bidirectional_astar([[1, 2, 3], [4, 5, 6], [8, 7, 0]], 3, 3) == (-1, [])
+
+
+
 """The following are Price specific tests"""
 
 """ Test to ensure that the solution produced by price correctly 
@@ -240,7 +803,7 @@ def test_timeout_price():
     
     # Assert the printed output and the return value
     assert "timeout exception" in capturedOutput.getvalue()
-    assert result == (-1, [])
+    assert result == (-1, [], None)
 
 # Test to ensure that the manhattan_search identifies an already solved state 
 # and returns a status of 1 with no moves
@@ -258,8 +821,7 @@ def test_unsolvable_state_price():
         [4, 5, 6],
         [8, 7, 0]
     ]
-    status, _ = price(unsolvable_state, 3, 3)
-    assert status == -1
+    assert price(unsolvable_state, 3, 3) == (-1, [], None)
 
 
 """Test to ensure that the manhattan_distance function correctly calculates 
@@ -270,4 +832,178 @@ def test_weighted_manhattan_distance():
         [4, 5, 6],
         [7, 0, 8]
     ]
-    assert weighted_mdistance(state) == 8 
\ No newline at end of file
+    assert weighted_mdistance(state) == 8 
+
+
+""" Test to ensure that the weighted linear conflict heuristic finds equally cheap solutions, that the weighted A* mode
+ stays within its (1 + epsilon) bound, and that tiles leaving a line cost their own value"""
+def test_price_heuristics():
+    assert weighted_line_conflicts([1, 0], [2, 1]) == 1
+    assert weighted_line_conflicts([2, 0, 1], [3, 1, 2]) == 3
+    for _ in range(5):
+        initial_state = random_solvable_state(3, 3)
+        _, _, cheapest = price(initial_state, 3, 3)
+        status, moves, cost = price(initial_state, 3, 3, heuristic="weighted_linear_conflict")
+        assert status == 1 and cost == cheapest == sum(moves)
+        status, moves, cost = price(initial_state, 3, 3, heuristic="weighted_linear_conflict", epsilon=0.5)
+        assert is_complete(apply_moves_to_state(initial_state, moves), generate_goal_state(3, 3))
+        assert cheapest <= cost <= 1.5 * cheapest
+    with pytest.raises(ValueError):
+        price(generate_goal_state(3, 3), 3, 3, heuristic="manhattan")
+
+""" Test to ensure that the NumPy batch heuristics agree exactly with manhattan_distance, weighted_mdistance and the
+ linear conflict heuristic on every board of a batch"""
+def test_batch_heuristics():
+    pytest.importorskip("numpy")
+    from vectorized import linear_conflict_values, manhattan_distances, random_solvable_boards, weighted_distances
+    for n, m in [(3, 3), (4, 4), (3, 5), (2, 2)]:
+        boards = random_solvable_boards(100, n, m, seed=3)
+        states = [[row[i * m:(i + 1) * m].tolist() for i in range(n)] for row in boards]
+        layout = get_layout(n, m)
+        linear_conflict = get_heuristic("linear_conflict", n, m)
+        assert manhattan_distances(boards, n, m).tolist() == [manhattan_distance(state) for state in states]
+        assert weighted_distances(boards, n, m).tolist() == [weighted_mdistance(state) for state in states]
+        assert linear_conflict_values(boards, n, m).tolist() == [linear_conflict.evaluate(layout.pack(state)[0]) for state in states]
+
+
+""" Test to ensure that the batched expansion kernel produces the same children, heuristic values and keys as
+ expanding the boards one at a time, and drops children that were seen before"""
+def test_expand_frontier():
+    pytest.importorskip("numpy")
+    from vectorized import board_keys, expand_frontier, manhattan_distances, random_solvable_boards, unseen_children
+    layout = get_layout(3, 4)
+    boards = random_solvable_boards(20, 3, 4, seed=4)
+    blanks = (boards == 0).argmax(axis=1)
+    keys = board_keys(boards, 3, 4)
+    children, child_blanks, child_h, child_keys, parent_rows, tiles = expand_frontier(boards, blanks, manhattan_distances(boards, 3, 4), keys, 3, 4)
+    expected = []
+    for row, blank in zip(boards.tolist(), blanks.tolist()):
+        packed = layout.pack_flat(row)
+        expected += [(layout.unpack_flat(child), child_blank, tile) for child, child_blank, tile in layout.children(packed, blank)]
+    assert list(zip(children.tolist(), child_blanks.tolist(), tiles.tolist())) == expected
+    assert child_h.tolist() == manhattan_distances(children, 3, 4).tolist()
+    assert (child_keys == board_keys(children, 3, 4)).all()
+    seen = set(keys.tolist())
+    fresh = unseen_children(child_keys, seen)
+    assert len(fresh) == len(set(child_keys.tolist()) - set(keys.tolist()))
+    assert len(unseen_children(child_keys, seen)) == 0
+
+""" Test to ensure that the batched best-first search and its beam mode solve random boards"""
+def test_batched_search():
+    pytest.importorskip("numpy")
+    from batched_search import batched_search
+    for n, m, width in [(3, 3, None), (4, 4, None), (4, 4, 500), (5, 5, 2000)]:
+        initial_state = random_solvable_state(n, m)
+        status, moves = batched_search(initial_state, n, m, batch_size=64, width=width)
+        assert status == 1
+        assert is_complete(apply_moves_to_state(initial_state, moves), generate_goal_state(n, m))
+    assert batched_search(generate_goal_state(3, 3), 3, 3) == (1, [])
+
+""" Test to ensure that the anytime solver streams strictly cheaper solutions, ends on the optimum for both costs, and
+ still returns its best solution when the budget runs out"""
+def test_anytime_search():
+    from anytime import anytime, anytime_search
+    for _ in range(5):
+        initial_state = random_solvable_state(3, 3)
+        solutions = list(anytime_search(initial_state, 3, 3))
+        costs = [total for _, total in solutions]
+        assert all(later < earlier for earlier, later in zip(costs, costs[1:]))
+        for moves, total in solutions:
+            assert len(moves) == total
+            assert is_complete(apply_moves_to_state(initial_state, moves), generate_goal_state(3, 3))
+        assert costs[-1] == len(astar(initial_state, 3, 3)[1])
+        assert anytime(initial_state, 3, 3, cost="price")[2] == price(initial_state, 3, 3)[2]
+    stats = SearchStats()
+    found = []
+    status, moves = anytime(random_walk_state(4, 4, 200, random.Random(5)), 4, 4, callback=lambda moves, total: found.append(total),
+                            stats=stats, budget=Budget(max_expansions=20000))
+    assert status == 1 and found[-1] == len(moves) and stats.stop_reason == "expansions"
+    assert list(anytime_search([[1, 2, 3], [4, 5, 6], [8, 7, 0]], 3, 3)) == []
+    assert list(anytime_search(generate_goal_state(3, 3), 3, 3)) == [([], 0)]
+
+""" Test to ensure that beam search solves boards with a bounded layer width, keeps its parent table to at most width
+ states per move, and stops under a memory cap"""
+def test_beam_search():
+    from manhattan import beam_search
+    for n, m, width in [(3, 3, 1), (3, 3, 50), (4, 4, 100), (5, 5, 200)]:
+        initial_state = random_solvable_state(n, m)
+        stats = SearchStats()
+        status, moves = beam_search(initial_state, n, m, width=width, stats=stats)
+        assert status == 1 or (width == 1 and status == -1)
+        if status == 1:
+            assert is_complete(apply_moves_to_state(initial_state, moves), generate_goal_state(n, m))
+            assert stats.expanded <= width * len(moves)
+    assert beam_search(generate_goal_state(3, 3), 3, 3) == (1, [])
+    stats = SearchStats()
+    assert beam_search(random_solvable_state(5, 5), 5, 5, width=10**6, stats=stats, budget=Budget(max_memory=1)) == (-1, [])
+    assert stats.stop_reason == "memory"
+
+def counters(stats):
+    # the SearchStats fields that don't depend on timing
+    return {name: value for name, value in stats.as_dict().items() if name not in ("seconds", "peak_memory", "expansions_per_second")}
+
+""" Test to ensure that the compiled A* kernel, run here as plain Python, returns exactly the moves and counters of the
+ pure Python astar, including when it stops on an expansion budget"""
+def test_native_astar():
+    pytest.importorskip("numpy")
+    import native_search
+    for n, m in [(3, 3), (2, 4), (2, 2)]:
+        for _ in range(3):
+            initial_state = random_solvable_state(n, m)
+            python_stats, native_stats = SearchStats(), SearchStats()
+            expected = astar(initial_state, n, m, stats=python_stats, use_table=False, backend="python")
+            assert native_search.native_astar(initial_state, n, m, stats=native_stats, compiled=False) == expected
+            assert counters(native_stats) == counters(python_stats)
+    initial_state = random_walk_state(3, 4, 40, random.Random(6))
+    python_stats, native_stats = SearchStats(), SearchStats()
+    astar(initial_state, 3, 4, stats=python_stats, use_table=False, backend="python", budget=Budget(max_expansions=500))
+    assert native_search.native_astar(initial_state, 3, 4, stats=native_stats, budget=Budget(max_expansions=500), compiled=False) == (-1, [])
+    assert counters(native_stats) == counters(python_stats)
+    capturedOutput = io.StringIO()
+    sys.stdout = capturedOutput
+    native_stats = SearchStats()
+    result = native_search.native_astar(random_solvable_state(3, 4, random.Random(2)), 3, 4, stats=native_stats,
+                                        budget=Budget(max_memory=native_search.resident_memory() + 2**16), compiled=False)
+    sys.stdout = sys.__stdout__
+    assert result == (-1, []) and native_stats.stop_reason == "memory"
+    assert "timeout exception" in capturedOutput.getvalue()
+    assert native_search.default_max_memory() > native_search.resident_memory()
+    if not native_search.AVAILABLE:
+        with pytest.raises(ValueError):
+            astar(initial_state, 3, 4, use_table=False, backend="native")
+
+""" Test to ensure that the solvers fill in peak sizes, timings and memory, that heuristic timing is only done when
+ asked for, and that the report is one line of JSON"""
+def test_search_stats():
+    initial_state = random_walk_state(3, 3, 30, random.Random(8))
+    stats = SearchStats(time_heuristic=True)
+    assert astar(initial_state, 3, 3, stats=stats, use_table=False, backend="python")[0] == 1
+    assert stats.peak_closed == stats.expanded > 0 and stats.peak_open > 0
+    assert stats.heuristic_seconds > 0 and stats.seconds >= stats.heuristic_seconds
+    assert stats.peak_memory > 0 and stats.expansions_per_second > 0
+    report = io.StringIO()
+    stats.report(report)
+    assert json.loads(report.getvalue()) == stats.as_dict()
+    assert "_time_heuristic" not in stats.as_dict()
+    stats = SearchStats()
+    manhattan_search(initial_state, 3, 3, stats=stats)
+    assert stats.heuristic_seconds is None and stats.peak_closed == stats.expanded
+    stats = SearchStats(time_heuristic=True)
+    idastar(initial_state, 3, 3, stats=stats)
+    assert stats.peak_open is None and stats.heuristic_seconds is None and stats.seconds > 0
+    for solver in (price, bidirectional_astar):
+        stats = SearchStats(time_heuristic=True)
+        solver(initial_state, 3, 3, stats=stats)
+        assert stats.peak_open > 0 and stats.peak_closed > 0 and stats.heuristic_seconds > 0
+
+""" Test to ensure that answers that come from a solution cache say so in the stats and still record the time taken,
+ instead of looking like a search that did no work"""
+def test_search_stats_from_cache():
+    initial_state = random_walk_state(3, 3, 30, random.Random(8))
+    cache = SolutionCache()
+    stats = SearchStats()
+    cache.solve("astar", astar, initial_state, 3, 3, stats=stats, use_table=False)
+    assert stats.stop_reason is None and stats.expanded > 0
+    stats = SearchStats()
+    assert cache.solve("astar", astar, initial_state, 3, 3, stats=stats, use_table=False)[0] == 1
+    assert stats.stop_reason == "cache" and stats.expanded == 0 and stats.seconds > 0 and stats.peak_memory > 0
@@ -0,0 +1,202 @@
+from functools import lru_cache
+import numpy as np
+from PuzzleSolver import goal_coordinates, manhattan_table
+from state import get_layout
+
+# NumPy versions of the per-board helpers in PuzzleSolver.py, price.py and heuristics.py, for working on a whole batch
+# of boards in one call (scoring candidate sets, benchmark generation, beam search). A batch is an int array of shape
+# (B, n*m): one flattened board (row-major, 0 for the blank) per row. Every function here gives exactly the answer the
+# scalar version gives for each row.
+
+
+def as_batch(boards, n, m):
+    # accepts a (B, n*m) or (B, n, m) array, or a list of flat or nested boards
+    return np.asarray(boards, dtype=np.int64).reshape(-1, n * m)
+
+
+def inversion_parities(boards):
+    """inversion_parity for every row of a (B, k) batch. Sorts each row's tiles into place one value at a time with
+    swaps, counting the swaps; k vectorized steps in all."""
+    batch = len(boards)
+    rows = np.arange(batch)
+    tiles = boards[boards != 0].reshape(batch, -1) - 1  # the tiles in board order, as a permutation of 0..k-2
+    positions = np.empty_like(tiles)
+    positions[rows[:, None], tiles] = np.arange(tiles.shape[1])  # positions[b, value] is where value sits in row b
+    swaps = np.zeros(batch, dtype=np.int64)
+    for value in range(tiles.shape[1]):
+        cell = positions[:, value].copy()
+        displaced = tiles[:, value].copy()
+        swaps += cell != value
+        # swap `value` into its own slot (a no-op on rows where it is there already)
+        tiles[rows, cell] = displaced
+        tiles[:, value] = value
+        positions[rows, displaced] = cell
+        positions[:, value] = value
+    return swaps % 2
+
+
+def solvable_mask(boards, n, m):
+    """Boolean array: is_solvable for every board in the batch."""
+    boards = as_batch(boards, n, m)
+    parities = inversion_parities(boards)
+    if m % 2 == 1:
+        return parities == 0
+    blank_rows = np.argmax(boards == 0, axis=1) // m
+    return (blank_rows + parities) % 2 == (n - 1) % 2
+
+
+def random_solvable_boards(count, n, m, seed=None):
+    """(count, n*m) array of uniformly random solvable boards, like random_solvable_state: every row is shuffled once
+    and the unsolvable ones have their first two tiles swapped. seed is anything np.random.default_rng accepts."""
+    rng = np.random.default_rng(seed)
+    size = n * m
+    boards = rng.permuted(np.tile(np.arange(size, dtype=np.int64), (count, 1)), axis=1)
+    if size < 3:  # a single tile can't be swapped, so reshuffle like the scalar version
+        unsolvable = ~solvable_mask(boards, n, m)
+        while unsolvable.any():
+            boards[unsolvable] = rng.permuted(boards[unsolvable], axis=1)
+            unsolvable = ~solvable_mask(boards, n, m)
+        return boards
+    rows = np.flatnonzero(~solvable_mask(boards, n, m))
+    blanks = np.argmax(boards[rows] == 0, axis=1)
+    # the first two cells that hold tiles: 1 and 2 if the blank is in cell 0, 0 and 2 if it is in cell 1, else 0 and 1
+    first = np.where(blanks == 0, 1, 0)
+    second = np.where(blanks <= 1, 2, 1)
+    boards[rows, first], boards[rows, second] = boards[rows, second], boards[rows, first]
+    return boards
+
+
+@lru_cache(maxsize=None)
+def neighbour_array(n, m):
+    # layout.neighbours as a (n*m, 4) array padded with -1
+    neighbours = np.full((n * m, 4), -1, dtype=np.int64)
+    for cell, cells in enumerate(get_layout(n, m).neighbours):
+        neighbours[cell, :len(cells)] = cells
+    neighbours.setflags(write=False)
+    return neighbours
+
+
+def random_walk_boards(count, n, m, depth, seed=None):
+    """(count, n*m) array of boards `depth` random moves from the goal, like random_walk_state: every walk takes one
+    step per round, never undoing the previous move unless it is stuck at the end of a single row or column."""
+    rng = np.random.default_rng(seed)
+    size = n * m
+    rows = np.arange(count)
+    neighbours = neighbour_array(n, m)
+    boards = np.tile(np.append(np.arange(1, size, dtype=np.int64), 0), (count, 1))
+    blanks = np.full(count, size - 1)
+    previous = np.full(count, -1)
+    if size == 1:
+        return boards
+    for _ in range(depth):
+        options = neighbours[blanks]
+        allowed = (options >= 0) & (options != previous[:, None])
+        allowed[~allowed.any(axis=1)] = options[~allowed.any(axis=1)] >= 0
+        # a random score per option, pushing the disallowed ones below every allowed one, picks uniformly
+        choice = np.argmax(np.where(allowed, rng.random(options.shape), -1.0), axis=1)
+        cells = options[rows, choice]
+        boards[rows, blanks] = boards[rows, cells]
+        boards[rows, cells] = 0
+        previous, blanks = blanks, cells
+    return boards
+
+
+@lru_cache(maxsize=None)
+def lookup_arrays(n, m):
+    """(manhattan, weighted, goal_rows, goal_columns) for an n x m board: manhattan_table and price's weighted table
+    as (n*m, n*m) arrays indexed [tile, cell], and the goal row and column of every tile (0 for the blank)."""
+    manhattan = np.array(manhattan_table(n, m), dtype=np.int64)
+    weighted = manhattan * np.arange(n * m)[:, None]
+    coordinates = np.array([(0, 0)] + list(goal_coordinates(n, m)[1:]), dtype=np.int64)
+    arrays = manhattan, weighted, coordinates[:, 0], coordinates[:, 1]
+    for array in arrays:
+        array.setflags(write=False)  # shared by every caller through the cache
+    return arrays
+
+
+def manhattan_distances(boards, n, m):
+    """manhattan_distance for every board in the batch."""
+    boards = as_batch(boards, n, m)
+    return lookup_arrays(n, m)[0][boards, np.arange(n * m)].sum(axis=1)
+
+
+def weighted_distances(boards, n, m):
+    """price.weighted_mdistance for every board in the batch."""
+    boards = as_batch(boards, n, m)
+    return lookup_arrays(n, m)[1][boards, np.arange(n * m)].sum(axis=1)
+
+
+def line_conflict_counts(goal_positions, belongs):
+    """heuristics.line_conflicts for a batch of lines: goal_positions (L, k) holds where each tile wants to be along
+    its line and belongs (L, k) marks the tiles whose goal is this line. Same longest-increasing-run count."""
+    longest = np.zeros(goal_positions.shape, dtype=np.int64)
+    for i in range(goal_positions.shape[1]):
+        best = np.ones(len(goal_positions), dtype=np.int64)
+        for j in range(i):
+            extends = belongs[:, j] & (goal_positions[:, j] < goal_positions[:, i])
+            best = np.maximum(best, np.where(extends, longest[:, j] + 1, 1))
+        longest[:, i] = np.where(belongs[:, i], best, 0)
+    return belongs.sum(axis=1) - longest.max(axis=1, initial=0)
+
+
+def linear_conflict_values(boards, n, m):
+    """LinearConflictHeuristic.evaluate for every board in the batch: Manhattan distance plus two moves per conflict."""
+    boards = as_batch(boards, n, m)
+    _, _, goal_rows, goal_columns = lookup_arrays(n, m)
+    grid = boards.reshape(-1, n, m)
+    # every row of every board as one batch of lines, then every column
+    rows = grid.reshape(-1, m)
+    row_index = np.tile(np.arange(n), len(boards))[:, None]
+    columns = grid.transpose(0, 2, 1).reshape(-1, n)
+    column_index = np.tile(np.arange(m), len(boards))[:, None]
+    row_conflicts = line_conflict_counts(goal_columns[rows], (rows != 0) & (goal_rows[rows] == row_index))
+    column_conflicts = line_conflict_counts(goal_rows[columns], (columns != 0) & (goal_columns[columns] == column_index))
+    conflicts = row_conflicts.reshape(-1, n).sum(axis=1) + column_conflicts.reshape(-1, m).sum(axis=1)
+    return manhattan_distances(boards, n, m) + 2 * conflicts
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(n, m):
+    # a fixed random 64-bit key for every (tile, cell); a board's key is the XOR of its tiles' keys, so a move changes it
+    # by two XORs. Two different boards share a key with odds around 2^-64 per pair.
+    keys = np.random.default_rng(n * 1000 + m).integers(0, 2 ** 63, size=(n * m, n * m), dtype=np.uint64)
+    keys[0] = 0  # where the blank is follows from where the tiles are
+    keys.setflags(write=False)
+    return keys
+
+
+def board_keys(boards, n, m):
+    """64-bit hash key for every board in the batch."""
+    boards = as_batch(boards, n, m)
+    return np.bitwise_xor.reduce(zobrist_keys(n, m)[boards, np.arange(n * m)], axis=1)
+
+
+def expand_frontier(boards, blanks, h, keys, n, m, table=None):
+    """Every legal child of every board in a (B, n*m) frontier in one go, the vectorized counterpart of
+    layout.children plus update_heuristic. blanks, h and keys are the frontier's blank cells, heuristic values and
+    board_keys; table is the per-tile lookup the heuristic uses (lookup_arrays' Manhattan table by default, or the
+    weighted one). Returns (boards, blanks, h, keys, parent rows, tiles moved) for the children."""
+    if table is None:
+        table = lookup_arrays(n, m)[0]
+    options = neighbour_array(n, m)[blanks]
+    parents, slots = np.nonzero(options >= 0)
+    cells = options[parents, slots]  # the cell each child's tile slides out of, which becomes its blank
+    parent_blanks = blanks[parents]
+    tiles = boards[parents, cells]
+    children = boards[parents]
+    children[np.arange(len(parents)), parent_blanks] = tiles
+    children[np.arange(len(parents)), cells] = 0
+    child_h = h[parents] - table[tiles, cells] + table[tiles, parent_blanks]
+    zobrist = zobrist_keys(n, m)
+    child_keys = keys[parents] ^ zobrist[tiles, cells] ^ zobrist[tiles, parent_blanks]
+    return children, cells, child_h, child_keys, parents, tiles
+
+
+def unseen_children(keys, seen):
+    """Indices of the children worth keeping: the first of each key within the batch, and none whose key is already
+    in `seen` (a set of ints, which this adds the kept keys to)."""
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    fresh = [index for index, key in zip(first.tolist(), keys[first].tolist()) if key not in seen]
+    seen.update(keys[fresh].tolist())
+    return np.array(fresh, dtype=np.int64)